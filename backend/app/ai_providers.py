@@ -1,17 +1,235 @@
 import os
-import json
 import httpx
-from typing import Dict, List, Optional, Any
+import orjson
+import fastjsonschema
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime
 from abc import ABC, abstractmethod
+from types import MappingProxyType
 import asyncio
+import random
 from dotenv import load_dotenv
 
+from .llm_cache import cached_llm
+from .rate_limiter import TokenBucket
+from .request_batcher import RequestBatcher
+from .utils.phrase_index import PhraseIndex
+
 load_dotenv()
 
+_SIGN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "gloss": {"type": "string"},
+        "signs": {"type": "array", "items": {"type": "string"}, "default": []},
+        "facial_expression": {"type": "string", "default": "neutral"}
+    },
+    "required": ["gloss"]
+}
+
+_SPEECH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "text": {"type": "string"},
+        "variations": {"type": "array", "items": {"type": "string"}, "default": []},
+        "confidence": {"type": "number", "default": 0.9}
+    },
+    "required": ["text"]
+}
+
+# Compiled once at import; validation also fills in defaults for optional fields
+_SIGN_VALIDATOR = fastjsonschema.compile(_SIGN_SCHEMA)
+_SPEECH_VALIDATOR = fastjsonschema.compile(_SPEECH_SCHEMA)
+
+# Anthropic tool definitions used to force structured output
+_SIGN_TOOL = {
+    "name": "emit_asl",
+    "description": "Return the ASL gloss translation",
+    "input_schema": _SIGN_SCHEMA
+}
+
+_SPEECH_TOOL = {
+    "name": "emit_english",
+    "description": "Return the natural English translation",
+    "input_schema": _SPEECH_SCHEMA
+}
+
+# Enhanced mock translations, in match priority order
+_MOCK_TRANSLATIONS = MappingProxyType({
+    "hello": {"gloss": "HELLO WAVE", "signs": ["hello"], "expression": "smile"},
+    "thank you": {"gloss": "THANK-YOU", "signs": ["thank_you"], "expression": "neutral"},
+    "how are you": {"gloss": "HOW YOU ?", "signs": ["how", "you"], "expression": "questioning"},
+    "yes": {"gloss": "YES NOD", "signs": ["yes"], "expression": "affirm"},
+    "no": {"gloss": "NO SHAKE", "signs": ["no"], "expression": "negate"},
+    "please": {"gloss": "PLEASE", "signs": ["please"], "expression": "polite"},
+    "help": {"gloss": "HELP ME", "signs": ["help"], "expression": "urgent"},
+    "i love you": {"gloss": "I-LOVE-YOU", "signs": ["i_love_you"], "expression": "affection"},
+    "stop": {"gloss": "STOP", "signs": ["stop"], "expression": "firm"},
+    "good": {"gloss": "GOOD", "signs": ["good"], "expression": "positive"},
+    "bad": {"gloss": "BAD", "signs": ["bad"], "expression": "negative"},
+    "where": {"gloss": "WHERE ?", "signs": ["where"], "expression": "questioning"},
+    "what": {"gloss": "WHAT ?", "signs": ["what"], "expression": "questioning"},
+    "who": {"gloss": "WHO ?", "signs": ["who"], "expression": "questioning"},
+    "finish": {"gloss": "FINISH", "signs": ["finish"], "expression": "neutral"}
+})
+
+_MOCK_RESPONSES = MappingProxyType({
+    "hello": {"text": "Hello! Nice to see you.", "variations": ["Hi there!", "Hello!", "Greetings!"]},
+    "thank_you": {"text": "Thank you so much!", "variations": ["Thanks!", "I appreciate it"]},
+    "help": {"text": "Can you help me please?", "variations": ["I need help", "Help me"]},
+    "yes": {"text": "Yes, I agree.", "variations": ["Yes", "That's right", "Correct"]},
+    "no": {"text": "No, I don't think so.", "variations": ["No", "I disagree"]},
+    "stop": {"text": "Stop right there!", "variations": ["Stop", "Hold on", "Wait"]},
+    "good": {"text": "That's really good!", "variations": ["Good", "Great", "Excellent"]},
+    "bad": {"text": "That's not good.", "variations": ["Bad", "Not good", "Poor"]},
+    "what": {"text": "What do you mean?", "variations": ["What?", "What is it?"]},
+    "where": {"text": "Where is it?", "variations": ["Where?", "Which place?"]},
+    "who": {"text": "Who is that?", "variations": ["Who?", "Which person?"]},
+    "please": {"text": "Please, if you could.", "variations": ["Please", "If you would"]},
+    "more": {"text": "I need more information.", "variations": ["More", "Additional"]},
+    "finish": {"text": "I'm finished.", "variations": ["Done", "Complete", "Finished"]},
+    "i_love_you": {"text": "I love you!", "variations": ["Love you", "I love you too"]}
+})
+
+_MOCK_SUGGESTIONS = MappingProxyType({
+    "hello": ["How are you?", "Nice to meet you", "What's your name?"],
+    "thank": ["You're welcome", "I appreciate it", "No problem"],
+    "how": ["How are you?", "How can I help?", "How much?"],
+    "": ["Hello", "Thank you", "Please help me"]
+})
+
+_MOCK_SIGN_SUGGESTIONS = ["thank_you", "yes", "no", "help", "please"]
+
+# Constant fields of mock results; copied and filled in per call
+_MOCK_SIGN_TEMPLATE = MappingProxyType({
+    "success": True,
+    "facial_expression": "neutral",
+    "notes": "Mock translation"
+})
+
+_MOCK_SPEECH_TEMPLATE = MappingProxyType({
+    "success": True,
+    "variations": [],
+    "context_dependent": False,
+    "confidence": 0.95
+})
+
+# Single-scan matchers; "" stays out of the index as the suggestion default
+_MOCK_PHRASE_INDEX = PhraseIndex(_MOCK_TRANSLATIONS)
+_SUGGESTION_INDEX = PhraseIndex(key for key in _MOCK_SUGGESTIONS if key)
+
+# Every substring of a phrase -> signs of the first phrase containing it,
+# for the per-word fallback
+_MOCK_WORD_SIGNS: Dict[str, List[str]] = {}
+for _phrase, _translation in _MOCK_TRANSLATIONS.items():
+    for _i in range(len(_phrase)):
+        for _j in range(_i + 1, len(_phrase) + 1):
+            _MOCK_WORD_SIGNS.setdefault(_phrase[_i:_j], _translation["signs"])
+
+def _openai_delta(event: Dict[str, Any]) -> str:
+    """Text carried by one OpenAI chat completion chunk"""
+    choices = event.get("choices")
+    return ((choices[0].get("delta") or {}).get("content") or "") if choices else ""
+
+def _anthropic_delta(event: Dict[str, Any]) -> str:
+    """Tool input JSON carried by one Anthropic stream event"""
+    if event.get("type") == "content_block_delta":
+        return (event.get("delta") or {}).get("partial_json", "")
+    return ""
+
+# Failures that fall back to mock responses: transport errors, timeouts, and
+# malformed replies (bad JSON, missing batch results, unexpected event shapes)
+_PROVIDER_ERRORS = (httpx.HTTPError, httpx.StreamError, asyncio.TimeoutError,
+                    ValueError, KeyError, TypeError, IndexError)
+
+# Upstream statuses worth retrying (rate limited / overloaded)
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504, 529})
+_MAX_ATTEMPTS = 4
+
 class AIProvider(ABC):
     """Abstract base class for AI providers"""
     
+    # Shared HTTP client so keep-alive connections are reused across calls
+    _client: Optional[httpx.AsyncClient] = None
+    _client_lock = asyncio.Lock()
+    
+    @classmethod
+    async def _get_client(cls) -> httpx.AsyncClient:
+        """Get the shared HTTP/2 client, creating it on first use"""
+        if AIProvider._client is None or AIProvider._client.is_closed:
+            async with AIProvider._client_lock:
+                if AIProvider._client is None or AIProvider._client.is_closed:
+                    AIProvider._client = httpx.AsyncClient(
+                        http2=True,
+                        limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100),
+                        timeout=httpx.Timeout(30.0, connect=5.0)
+                    )
+        return AIProvider._client
+    
+    @classmethod
+    async def close_client(cls):
+        """Close the shared HTTP client (called on app shutdown)"""
+        if AIProvider._client is not None:
+            await AIProvider._client.aclose()
+            AIProvider._client = None
+    
+    async def _stream_json(self, url: str, headers: Dict[str, str], payload: Dict[str, Any],
+                           delta_text: Callable[[Dict[str, Any]], str]) -> str:
+        """
+        POST a streaming request through the provider's rate limiter and return
+        the JSON text as soon as it is complete, retrying 429/5xx with backoff
+        
+        delta_text pulls the generated text out of one server-sent event.
+        """
+        client = await self._get_client()
+        body = orjson.dumps(payload)
+        for attempt in range(_MAX_ATTEMPTS):
+            await self.limiter.acquire()
+            async with client.stream("POST", url, headers=headers, content=body) as response:
+                if response.status_code not in _RETRY_STATUSES or attempt == _MAX_ATTEMPTS - 1:
+                    response.raise_for_status()
+                    return await self._read_json_stream(response, delta_text)
+                
+                # Exponential backoff with jitter, unless the server says how long to wait
+                delay = min(8.0, 0.5 * 2 ** attempt) + random.uniform(0, 0.5)
+                retry_after = response.headers.get("retry-after", "")
+                if retry_after.replace(".", "", 1).isdigit():
+                    delay = min(8.0, float(retry_after))
+            await asyncio.sleep(delay)
+    
+    @staticmethod
+    async def _read_json_stream(response: httpx.Response,
+                                delta_text: Callable[[Dict[str, Any]], str]) -> str:
+        """Accumulate streamed text, stopping once it parses as a JSON object"""
+        buf = bytearray()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            try:
+                event = orjson.loads(data)
+            except orjson.JSONDecodeError:
+                # Keep-alives and other non-JSON lines carry no text
+                continue
+            chunk = delta_text(event)
+            if not chunk:
+                continue
+            buf += chunk.encode()
+            # Trailing tokens after the closing brace carry nothing useful
+            if chunk.rstrip().endswith("}"):
+                try:
+                    orjson.loads(buf)
+                    break
+                except orjson.JSONDecodeError:
+                    pass
+        return buf.decode()
+    
+    async def close(self):
+        """Release provider-owned resources (the shared client is closed separately)"""
+        pass
+    
     @abstractmethod
     async def translate_speech_to_sign(self, text: str, context: List[Dict] = None) -> Dict[str, Any]:
         pass
@@ -31,7 +249,12 @@ class OpenAIProvider(AIProvider):
         self.api_key = os.getenv("OPENAI_API_KEY", "")
         self.base_url = "https://api.openai.com/v1/chat/completions"
         self.model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+        self.limiter = TokenBucket(float(os.getenv("OPENAI_RATE_LIMIT", "50")))
+        # Coalesce concurrent prompts into one completion when OPENAI_BATCH_SIZE > 1
+        batch_size = int(os.getenv("OPENAI_BATCH_SIZE", "1"))
+        self.batcher = RequestBatcher(self._call_api_batch, max_batch_size=batch_size) if batch_size > 1 else None
         
+    @cached_llm("speech_to_sign")
     async def translate_speech_to_sign(self, text: str, context: List[Dict] = None) -> Dict[str, Any]:
         if not self.api_key:
             return self._mock_response("speech_to_sign", text)
@@ -40,10 +263,11 @@ class OpenAIProvider(AIProvider):
             prompt = self._create_speech_to_sign_prompt(text, context)
             response = await self._call_api(prompt)
             return self._parse_sign_response(response)
-        except Exception as e:
+        except _PROVIDER_ERRORS as e:
             print(f"OpenAI error: {e}")
             return self._mock_response("speech_to_sign", text)
     
+    @cached_llm("sign_to_speech")
     async def translate_sign_to_speech(self, gesture: str, context: List[Dict] = None) -> Dict[str, Any]:
         if not self.api_key:
             return self._mock_response("sign_to_speech", gesture)
@@ -52,68 +276,87 @@ class OpenAIProvider(AIProvider):
             prompt = self._create_sign_to_speech_prompt(gesture, context)
             response = await self._call_api(prompt)
             return self._parse_speech_response(response)
-        except Exception as e:
+        except _PROVIDER_ERRORS as e:
             print(f"OpenAI error: {e}")
             return self._mock_response("sign_to_speech", gesture)
     
     async def _call_api(self, prompt: str) -> str:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.base_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": "You are an expert ASL translator."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    "temperature": 0.3,
-                    "max_tokens": 200
-                }
-            )
-            response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
+        if self.batcher is not None:
+            return await self.batcher.submit(prompt)
+        return await self._post_completion(prompt)
     
-    def _create_speech_to_sign_prompt(self, text: str, context: List[Dict] = None) -> str:
-        return f"""Convert this English to ASL gloss notation:
-"{text}"
+    async def _call_api_batch(self, prompts: List[str]) -> List[str]:
+        if len(prompts) == 1:
+            return [await self._post_completion(prompts[0])]
+        
+        numbered = "\n\n".join(f"{i + 1}. {prompt}" for i, prompt in enumerate(prompts))
+        prompt = f"""Answer each numbered request below.
+Reply as {{"results": [...]}} with one JSON object per request, in order.
 
-Return JSON: {{"gloss": "ASL GLOSS", "signs": ["sign1", "sign2"], "facial_expression": "neutral"}}"""
+{numbered}"""
+        response = await self._post_completion(prompt, max_tokens=200 * len(prompts))
+        try:
+            return [orjson.dumps(item).decode() for item in orjson.loads(response)["results"]]
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            # Malformed combined reply; ask for each prompt separately
+            return await asyncio.gather(*[self._post_completion(p) for p in prompts])
+    
+    async def _post_completion(self, prompt: str, max_tokens: int = 200) -> str:
+        return await self._stream_json(
+            self.base_url,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            payload={
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": "You are an expert ASL translator. Reply in JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                "response_format": {"type": "json_object"},
+                "temperature": 0.3,
+                "max_tokens": max_tokens,
+                "stream": True
+            },
+            delta_text=_openai_delta
+        )
+    
+    def _create_speech_to_sign_prompt(self, text: str, context: List[Dict] = None) -> str:
+        return f"""English to ASL gloss: "{text}"
+Keys: gloss, signs, facial_expression"""
     
     def _create_sign_to_speech_prompt(self, gesture: str, context: List[Dict] = None) -> str:
-        return f"""Convert this ASL sign to natural English:
-"{gesture}"
-
-Return JSON: {{"text": "Natural English", "variations": ["alt1", "alt2"], "confidence": 0.9}}"""
+        return f"""ASL sign to natural English: "{gesture}"
+Keys: text, variations, confidence"""
     
     def _parse_sign_response(self, response: str) -> Dict[str, Any]:
         try:
-            data = json.loads(response)
-            return {
-                "success": True,
-                "gloss": data.get("gloss", ""),
-                "signs": data.get("signs", []),
-                "facial_expression": data.get("facial_expression", "neutral"),
-                "timestamp": datetime.now().isoformat()
-            }
-        except:
+            data = _SIGN_VALIDATOR(orjson.loads(response))
+        except (orjson.JSONDecodeError, fastjsonschema.JsonSchemaException) as e:
+            print(f"Invalid sign response: {e}")
             return self._mock_response("speech_to_sign", response)
+        return {
+            "success": True,
+            "gloss": data["gloss"],
+            "signs": data["signs"],
+            "facial_expression": data["facial_expression"],
+            "timestamp": datetime.now().isoformat()
+        }
     
     def _parse_speech_response(self, response: str) -> Dict[str, Any]:
         try:
-            data = json.loads(response)
-            return {
-                "success": True,
-                "text": data.get("text", ""),
-                "variations": data.get("variations", []),
-                "confidence": data.get("confidence", 0.9),
-                "timestamp": datetime.now().isoformat()
-            }
-        except:
+            data = _SPEECH_VALIDATOR(orjson.loads(response))
+        except (orjson.JSONDecodeError, fastjsonschema.JsonSchemaException) as e:
+            print(f"Invalid speech response: {e}")
             return self._mock_response("sign_to_speech", response)
+        return {
+            "success": True,
+            "text": data["text"],
+            "variations": data["variations"],
+            "confidence": data["confidence"],
+            "timestamp": datetime.now().isoformat()
+        }
     
     def _mock_response(self, mode: str, input_text: str) -> Dict[str, Any]:
         # Same mock logic as CerebrasClient
@@ -123,6 +366,7 @@ Return JSON: {{"text": "Natural English", "variations": ["alt1", "alt2"], "confi
                 "gloss": "MOCK TRANSLATION",
                 "signs": ["hello", "what"],
                 "facial_expression": "neutral",
+                "fallback": True,
                 "timestamp": datetime.now().isoformat()
             }
         else:
@@ -131,6 +375,7 @@ Return JSON: {{"text": "Natural English", "variations": ["alt1", "alt2"], "confi
                 "text": f"Mock translation for {input_text}",
                 "variations": [],
                 "confidence": 0.8,
+                "fallback": True,
                 "timestamp": datetime.now().isoformat()
             }
     
@@ -147,87 +392,89 @@ class AnthropicProvider(AIProvider):
         self.api_key = os.getenv("ANTHROPIC_API_KEY", "")
         self.base_url = "https://api.anthropic.com/v1/messages"
         self.model = os.getenv("ANTHROPIC_MODEL", "claude-3-haiku-20240307")
+        self.limiter = TokenBucket(float(os.getenv("ANTHROPIC_RATE_LIMIT", "50")))
         
+    @cached_llm("speech_to_sign")
     async def translate_speech_to_sign(self, text: str, context: List[Dict] = None) -> Dict[str, Any]:
         if not self.api_key:
             return self._mock_response("speech_to_sign", text)
             
         try:
             prompt = self._create_speech_to_sign_prompt(text, context)
-            response = await self._call_api(prompt)
+            response = await self._call_api(prompt, _SIGN_TOOL)
             return self._parse_sign_response(response)
-        except Exception as e:
+        except _PROVIDER_ERRORS as e:
             print(f"Anthropic error: {e}")
             return self._mock_response("speech_to_sign", text)
     
+    @cached_llm("sign_to_speech")
     async def translate_sign_to_speech(self, gesture: str, context: List[Dict] = None) -> Dict[str, Any]:
         if not self.api_key:
             return self._mock_response("sign_to_speech", gesture)
             
         try:
             prompt = self._create_sign_to_speech_prompt(gesture, context)
-            response = await self._call_api(prompt)
+            response = await self._call_api(prompt, _SPEECH_TOOL)
             return self._parse_speech_response(response)
-        except Exception as e:
+        except _PROVIDER_ERRORS as e:
             print(f"Anthropic error: {e}")
             return self._mock_response("sign_to_speech", gesture)
     
-    async def _call_api(self, prompt: str) -> str:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.base_url,
-                headers={
-                    "x-api-key": self.api_key,
-                    "anthropic-version": "2023-06-01",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": 200,
-                    "temperature": 0.3
-                }
-            )
-            response.raise_for_status()
-            return response.json()["content"][0]["text"]
+    async def _call_api(self, prompt: str, tool: Dict[str, Any]) -> str:
+        """Call the Messages API forcing a tool call, returning the tool input JSON"""
+        return await self._stream_json(
+            self.base_url,
+            headers={
+                "x-api-key": self.api_key,
+                "anthropic-version": "2023-06-01",
+                "Content-Type": "application/json"
+            },
+            payload={
+                "model": self.model,
+                "system": "You are an expert ASL translator.",
+                "messages": [{"role": "user", "content": prompt}],
+                "tools": [tool],
+                "tool_choice": {"type": "tool", "name": tool["name"]},
+                "max_tokens": 200,
+                "temperature": 0.3,
+                "stream": True
+            },
+            delta_text=_anthropic_delta
+        )
     
     def _create_speech_to_sign_prompt(self, text: str, context: List[Dict] = None) -> str:
-        return f"""You are an expert ASL translator. Convert this English to ASL gloss notation:
-"{text}"
-
-Return only JSON: {{"gloss": "ASL GLOSS", "signs": ["sign1", "sign2"], "facial_expression": "neutral"}}"""
+        return f'Convert this English to ASL gloss notation: "{text}"'
     
     def _create_sign_to_speech_prompt(self, gesture: str, context: List[Dict] = None) -> str:
-        return f"""You are an expert ASL translator. Convert this ASL sign to natural English:
-"{gesture}"
-
-Return only JSON: {{"text": "Natural English", "variations": ["alt1", "alt2"], "confidence": 0.9}}"""
+        return f'Convert this ASL sign to natural English: "{gesture}"'
     
     def _parse_sign_response(self, response: str) -> Dict[str, Any]:
         try:
-            data = json.loads(response)
-            return {
-                "success": True,
-                "gloss": data.get("gloss", ""),
-                "signs": data.get("signs", []),
-                "facial_expression": data.get("facial_expression", "neutral"),
-                "timestamp": datetime.now().isoformat()
-            }
-        except:
+            data = _SIGN_VALIDATOR(orjson.loads(response))
+        except (orjson.JSONDecodeError, fastjsonschema.JsonSchemaException) as e:
+            print(f"Invalid sign response: {e}")
             return self._mock_response("speech_to_sign", response)
+        return {
+            "success": True,
+            "gloss": data["gloss"],
+            "signs": data["signs"],
+            "facial_expression": data["facial_expression"],
+            "timestamp": datetime.now().isoformat()
+        }
     
     def _parse_speech_response(self, response: str) -> Dict[str, Any]:
         try:
-            data = json.loads(response)
-            return {
-                "success": True,
-                "text": data.get("text", ""),
-                "variations": data.get("variations", []),
-                "confidence": data.get("confidence", 0.9),
-                "timestamp": datetime.now().isoformat()
-            }
-        except:
+            data = _SPEECH_VALIDATOR(orjson.loads(response))
+        except (orjson.JSONDecodeError, fastjsonschema.JsonSchemaException) as e:
+            print(f"Invalid speech response: {e}")
             return self._mock_response("sign_to_speech", response)
+        return {
+            "success": True,
+            "text": data["text"],
+            "variations": data["variations"],
+            "confidence": data["confidence"],
+            "timestamp": datetime.now().isoformat()
+        }
     
     def _mock_response(self, mode: str, input_text: str) -> Dict[str, Any]:
         if mode == "speech_to_sign":
@@ -236,6 +483,7 @@ Return only JSON: {{"text": "Natural English", "variations": ["alt1", "alt2"], "
                 "gloss": "MOCK TRANSLATION",
                 "signs": ["hello", "what"],
                 "facial_expression": "neutral",
+                "fallback": True,
                 "timestamp": datetime.now().isoformat()
             }
         else:
@@ -244,6 +492,7 @@ Return only JSON: {{"text": "Natural English", "variations": ["alt1", "alt2"], "
                 "text": f"Mock translation for {input_text}",
                 "variations": [],
                 "confidence": 0.8,
+                "fallback": True,
                 "timestamp": datetime.now().isoformat()
             }
     
@@ -256,115 +505,79 @@ Return only JSON: {{"text": "Natural English", "variations": ["alt1", "alt2"], "
 class MockProvider(AIProvider):
     """Mock provider for testing without API keys"""
     
+    @cached_llm("speech_to_sign")
     async def translate_speech_to_sign(self, text: str, context: List[Dict] = None) -> Dict[str, Any]:
         text_lower = text.lower()
         
-        # Enhanced mock translations
-        mock_translations = {
-            "hello": {"gloss": "HELLO WAVE", "signs": ["hello"], "expression": "smile"},
-            "thank you": {"gloss": "THANK-YOU", "signs": ["thank_you"], "expression": "neutral"},
-            "how are you": {"gloss": "HOW YOU ?", "signs": ["how", "you"], "expression": "questioning"},
-            "yes": {"gloss": "YES NOD", "signs": ["yes"], "expression": "affirm"},
-            "no": {"gloss": "NO SHAKE", "signs": ["no"], "expression": "negate"},
-            "please": {"gloss": "PLEASE", "signs": ["please"], "expression": "polite"},
-            "help": {"gloss": "HELP ME", "signs": ["help"], "expression": "urgent"},
-            "i love you": {"gloss": "I-LOVE-YOU", "signs": ["i_love_you"], "expression": "affection"},
-            "stop": {"gloss": "STOP", "signs": ["stop"], "expression": "firm"},
-            "good": {"gloss": "GOOD", "signs": ["good"], "expression": "positive"},
-            "bad": {"gloss": "BAD", "signs": ["bad"], "expression": "negative"},
-            "where": {"gloss": "WHERE ?", "signs": ["where"], "expression": "questioning"},
-            "what": {"gloss": "WHAT ?", "signs": ["what"], "expression": "questioning"},
-            "who": {"gloss": "WHO ?", "signs": ["who"], "expression": "questioning"},
-            "finish": {"gloss": "FINISH", "signs": ["finish"], "expression": "neutral"}
-        }
-        
-        for phrase, translation in mock_translations.items():
-            if phrase in text_lower:
-                return {
-                    "success": True,
-                    "gloss": translation["gloss"],
-                    "signs": translation["signs"],
-                    "facial_expression": translation["expression"],
-                    "notes": "Mock translation",
-                    "timestamp": datetime.now().isoformat()
-                }
-        
-        # Default: split into words and look for individual signs
-        words = text_lower.split()
-        signs = []
-        for word in words:
-            for phrase, translation in mock_translations.items():
-                if word in phrase:
-                    signs.extend(translation["signs"])
-                    break
-        
-        if not signs:
-            signs = ["what"]
+        match = _MOCK_PHRASE_INDEX.first_match(text_lower)
+        result = dict(_MOCK_SIGN_TEMPLATE)
+        if match is not None:
+            translation = _MOCK_TRANSLATIONS[match]
+            result["gloss"] = translation["gloss"]
+            result["signs"] = translation["signs"]
+            result["facial_expression"] = translation["expression"]
+        else:
+            # Default: split into words and look for individual signs
+            signs = []
+            for word in text_lower.split():
+                word_signs = _MOCK_WORD_SIGNS.get(word)
+                if word_signs:
+                    signs.extend(word_signs)
+            
+            if not signs:
+                signs = ["what"]
+            
+            result["gloss"] = " ".join(signs).upper()
+            result["signs"] = signs
         
-        return {
-            "success": True,
-            "gloss": " ".join(signs).upper(),
-            "signs": signs,
-            "facial_expression": "neutral",
-            "notes": "Mock translation",
-            "timestamp": datetime.now().isoformat()
-        }
+        result["timestamp"] = datetime.now().isoformat()
+        return result
     
+    @cached_llm("sign_to_speech")
     async def translate_sign_to_speech(self, gesture: str, context: List[Dict] = None) -> Dict[str, Any]:
-        mock_responses = {
-            "hello": {"text": "Hello! Nice to see you.", "variations": ["Hi there!", "Hello!", "Greetings!"]},
-            "thank_you": {"text": "Thank you so much!", "variations": ["Thanks!", "I appreciate it"]},
-            "help": {"text": "Can you help me please?", "variations": ["I need help", "Help me"]},
-            "yes": {"text": "Yes, I agree.", "variations": ["Yes", "That's right", "Correct"]},
-            "no": {"text": "No, I don't think so.", "variations": ["No", "I disagree"]},
-            "stop": {"text": "Stop right there!", "variations": ["Stop", "Hold on", "Wait"]},
-            "good": {"text": "That's really good!", "variations": ["Good", "Great", "Excellent"]},
-            "bad": {"text": "That's not good.", "variations": ["Bad", "Not good", "Poor"]},
-            "what": {"text": "What do you mean?", "variations": ["What?", "What is it?"]},
-            "where": {"text": "Where is it?", "variations": ["Where?", "Which place?"]},
-            "who": {"text": "Who is that?", "variations": ["Who?", "Which person?"]},
-            "please": {"text": "Please, if you could.", "variations": ["Please", "If you would"]},
-            "more": {"text": "I need more information.", "variations": ["More", "Additional"]},
-            "finish": {"text": "I'm finished.", "variations": ["Done", "Complete", "Finished"]},
-            "i_love_you": {"text": "I love you!", "variations": ["Love you", "I love you too"]}
-        }
-        
-        response = mock_responses.get(gesture, {
-            "text": f"The sign for {gesture}",
-            "variations": []
-        })
-        
-        return {
-            "success": True,
-            "text": response["text"],
-            "variations": response.get("variations", []),
-            "context_dependent": False,
-            "confidence": 0.95,
-            "timestamp": datetime.now().isoformat()
-        }
+        result = dict(_MOCK_SPEECH_TEMPLATE)
+        response = _MOCK_RESPONSES.get(gesture)
+        if response is not None:
+            result["text"] = response["text"]
+            result["variations"] = response["variations"]
+        else:
+            result["text"] = f"The sign for {gesture}"
+        result["timestamp"] = datetime.now().isoformat()
+        return result
     
     def get_suggestions(self, current_input: str, mode: str) -> List[str]:
         if mode == "speech_to_sign":
-            suggestions = {
-                "hello": ["How are you?", "Nice to meet you", "What's your name?"],
-                "thank": ["You're welcome", "I appreciate it", "No problem"],
-                "how": ["How are you?", "How can I help?", "How much?"],
-                "": ["Hello", "Thank you", "Please help me"]
-            }
-            
-            for key in suggestions:
-                if key in current_input.lower():
-                    return suggestions[key]
-            return suggestions[""]
+            return _MOCK_SUGGESTIONS[_SUGGESTION_INDEX.first_match(current_input.lower()) or ""]
         else:
-            return ["thank_you", "yes", "no", "help", "please"]
+            return _MOCK_SIGN_SUGGESTIONS
+
+class CerebrasAdapter(AIProvider):
+    """Adapts CerebrasClient to the AIProvider interface"""
+    
+    def __init__(self):
+        # Import here to avoid circular dependency and to skip loading the
+        # SDK unless Cerebras is actually selected
+        from .cerebras_client import CerebrasClient
+        self.client = CerebrasClient()
+    
+    async def translate_speech_to_sign(self, text: str, context: List[Dict] = None) -> Dict[str, Any]:
+        return await self.client.translate_speech_to_sign(text, context)
+    
+    async def translate_sign_to_speech(self, gesture: str, context: List[Dict] = None) -> Dict[str, Any]:
+        return await self.client.translate_sign_to_speech(gesture, context)
+    
+    def get_suggestions(self, current_input: str, mode: str) -> List[str]:
+        return self.client.get_suggestions(current_input, mode)
+    
+    async def close(self):
+        await self.client.close()
 
 class AIProviderFactory:
     """Factory to create AI providers based on configuration"""
     
     @staticmethod
     def create_provider(provider_name: str = None) -> AIProvider:
-        """Create an AI provider instance"""
+        """Create a new AI provider instance; callers keep and reuse it"""
         
         # If no provider specified, check environment
         if not provider_name:
@@ -372,22 +585,6 @@ class AIProviderFactory:
         
         # Check for API keys and return appropriate provider
         if provider_name == "cerebras" and os.getenv("CEREBRAS_API_KEY"):
-            # Import here to avoid circular dependency
-            from .cerebras_client import CerebrasClient
-            # Wrap CerebrasClient with adapter pattern
-            class CerebrasAdapter(AIProvider):
-                def __init__(self):
-                    self.client = CerebrasClient()
-                
-                async def translate_speech_to_sign(self, text: str, context: List[Dict] = None) -> Dict[str, Any]:
-                    return await self.client.translate_speech_to_sign(text, context)
-                
-                async def translate_sign_to_speech(self, gesture: str, context: List[Dict] = None) -> Dict[str, Any]:
-                    return await self.client.translate_sign_to_speech(gesture, context)
-                
-                def get_suggestions(self, current_input: str, mode: str) -> List[str]:
-                    return self.client.get_suggestions(current_input, mode)
-            
             return CerebrasAdapter()
         elif provider_name == "openai" and os.getenv("OPENAI_API_KEY"):
             return OpenAIProvider()
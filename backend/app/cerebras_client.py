@@ -1,13 +1,16 @@
 import os
-import json
+import httpx
+import orjson
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-import asyncio
 from dotenv import load_dotenv
 
+from .llm_cache import cached_llm
+from .utils.phrase_index import PhraseIndex
+
 # Try to import Cerebras SDK
 try:
-    from cerebras.cloud.sdk import Cerebras
+    from cerebras.cloud.sdk import AsyncCerebras
     CEREBRAS_AVAILABLE = True
 except ImportError:
     CEREBRAS_AVAILABLE = False
@@ -15,6 +18,56 @@ except ImportError:
 
 load_dotenv()
 
+# Common phrases after current input; "" is the default
+_SUGGESTIONS = {
+    "hello": ["How are you?", "Nice to meet you", "What's your name?"],
+    "thank": ["You're welcome", "I appreciate it", "No problem"],
+    "how": ["How are you?", "How can I help?", "How much?"],
+    "": ["Hello", "Thank you", "Please help me"]
+}
+_SUGGESTION_INDEX = PhraseIndex(key for key in _SUGGESTIONS if key)
+
+# Common sign sequences
+_SIGN_SUGGESTIONS = ["thank_you", "yes", "no", "help", "please"]
+
+# Static prompt fragments; only the context and input vary per call
+_SPEECH_TO_SIGN_HEAD = "Convert this English sentence to ASL gloss notation.\n"
+_SPEECH_TO_SIGN_TAIL = """
+
+Provide the response in this JSON format:
+{
+    "gloss": "ASL GLOSS HERE",
+    "signs": ["sign1", "sign2", "sign3"],
+    "facial_expression": "neutral/questioning/emphasis",
+    "notes": "any translation notes"
+}
+
+Remember ASL grammar rules:
+- Topic-comment structure
+- Time indicators come first
+- Questions use raised eyebrows
+- Negation uses head shake"""
+
+_SIGN_TO_SPEECH_HEAD = "Convert this ASL sign/gesture to natural English.\n"
+_SIGN_TO_SPEECH_TAIL = """
+
+Provide the response in this JSON format:
+{
+    "text": "Natural English translation",
+    "variations": ["alternative1", "alternative2"],
+    "context_dependent": true/false,
+    "confidence": 0.0-1.0
+}
+
+Consider context and provide the most natural English equivalent."""
+
+def _format_context(context: Optional[List[Dict]]) -> str:
+    """Render the last 3 context items for a prompt"""
+    if not context:
+        return ""
+    lines = [f"- {ctx.get('type', 'unknown')}: {ctx.get('content', '')}\n" for ctx in context[-3:]]
+    return "Previous context:\n" + "".join(lines)
+
 class CerebrasClient:
     def __init__(self):
         self.api_key = os.getenv("CEREBRAS_API_KEY", "")
@@ -23,7 +76,12 @@ class CerebrasClient:
         
         if CEREBRAS_AVAILABLE and self.api_key:
             try:
-                self.client = Cerebras(api_key=self.api_key)
+                # The SDK retries 429/5xx itself with backoff
+                self.client = AsyncCerebras(
+                    api_key=self.api_key,
+                    timeout=httpx.Timeout(30.0, connect=5.0),
+                    max_retries=3
+                )
                 print("Cerebras client initialized successfully")
             except Exception as e:
                 print(f"Failed to initialize Cerebras client: {e}")
@@ -31,6 +89,7 @@ class CerebrasClient:
         else:
             print("Using mock Cerebras client")
     
+    @cached_llm("speech_to_sign")
     async def translate_speech_to_sign(self, text: str, context: List[Dict] = None) -> Dict[str, Any]:
         """Translate speech text to ASL gloss notation"""
         try:
@@ -54,6 +113,7 @@ class CerebrasClient:
                 "gloss": "ERROR"
             }
     
+    @cached_llm("sign_to_speech")
     async def translate_sign_to_speech(self, gesture: str, context: List[Dict] = None) -> Dict[str, Any]:
         """Translate sign gesture to natural language"""
         try:
@@ -77,85 +137,41 @@ class CerebrasClient:
                 "variations": []
             }
     
+    async def close(self):
+        """Close the SDK's HTTP connections"""
+        if self.client:
+            await self.client.close()
+    
     async def _call_cerebras_api(self, prompt: str) -> str:
         """Make actual API call to Cerebras"""
         if not self.client:
             raise Exception("Cerebras client not initialized")
             
-        # Async wrapper for sync API call
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are an expert ASL translator. Provide accurate translations between English and ASL gloss notation."},
-                    {"role": "user", "content": prompt}
-                ],
-                model=self.model,
-                max_tokens=200,
-                temperature=0.3
-            )
+        response = await self.client.chat.completions.create(
+            messages=[
+                {"role": "system", "content": "You are an expert ASL translator. Provide accurate translations between English and ASL gloss notation."},
+                {"role": "user", "content": prompt}
+            ],
+            model=self.model,
+            max_tokens=200,
+            temperature=0.3
         )
         
         return response.choices[0].message.content
     
     def _create_speech_to_sign_prompt(self, text: str, context: List[Dict] = None) -> str:
         """Create prompt for speech to sign translation"""
-        context_str = ""
-        if context:
-            context_str = "Previous context:\n"
-            for ctx in context[-3:]:  # Last 3 context items
-                context_str += f"- {ctx.get('type', 'unknown')}: {ctx.get('content', '')}\n"
-        
-        prompt = f"""Convert this English sentence to ASL gloss notation.
-{context_str}
-English: "{text}"
-
-Provide the response in this JSON format:
-{{
-    "gloss": "ASL GLOSS HERE",
-    "signs": ["sign1", "sign2", "sign3"],
-    "facial_expression": "neutral/questioning/emphasis",
-    "notes": "any translation notes"
-}}
-
-Remember ASL grammar rules:
-- Topic-comment structure
-- Time indicators come first
-- Questions use raised eyebrows
-- Negation uses head shake"""
-        
-        return prompt
+        return "".join((_SPEECH_TO_SIGN_HEAD, _format_context(context), f'\nEnglish: "{text}"', _SPEECH_TO_SIGN_TAIL))
     
     def _create_sign_to_speech_prompt(self, gesture: str, context: List[Dict] = None) -> str:
         """Create prompt for sign to speech translation"""
-        context_str = ""
-        if context:
-            context_str = "Previous context:\n"
-            for ctx in context[-3:]:
-                context_str += f"- {ctx.get('type', 'unknown')}: {ctx.get('content', '')}\n"
-        
-        prompt = f"""Convert this ASL sign/gesture to natural English.
-{context_str}
-ASL Sign: "{gesture}"
-
-Provide the response in this JSON format:
-{{
-    "text": "Natural English translation",
-    "variations": ["alternative1", "alternative2"],
-    "context_dependent": true/false,
-    "confidence": 0.0-1.0
-}}
-
-Consider context and provide the most natural English equivalent."""
-        
-        return prompt
+        return "".join((_SIGN_TO_SPEECH_HEAD, _format_context(context), f'\nASL Sign: "{gesture}"', _SIGN_TO_SPEECH_TAIL))
     
     def _parse_sign_response(self, response: str) -> Dict[str, Any]:
         """Parse Cerebras response for sign translation"""
         try:
             # Try to parse JSON from response
-            data = json.loads(response)
+            data = orjson.loads(response)
             return {
                 "success": True,
                 "gloss": data.get("gloss", ""),
@@ -164,7 +180,7 @@ Consider context and provide the most natural English equivalent."""
                 "notes": data.get("notes", ""),
                 "timestamp": datetime.now().isoformat()
             }
-        except:
+        except (orjson.JSONDecodeError, AttributeError):
             # Fallback if JSON parsing fails
             return {
                 "success": True,
@@ -179,7 +195,7 @@ Consider context and provide the most natural English equivalent."""
         """Parse Cerebras response for speech translation"""
         try:
             # Try to parse JSON from response
-            data = json.loads(response)
+            data = orjson.loads(response)
             return {
                 "success": True,
                 "text": data.get("text", ""),
@@ -188,7 +204,7 @@ Consider context and provide the most natural English equivalent."""
                 "confidence": data.get("confidence", 0.9),
                 "timestamp": datetime.now().isoformat()
             }
-        except:
+        except (orjson.JSONDecodeError, AttributeError):
             # Fallback if JSON parsing fails
             return {
                 "success": True,
@@ -283,19 +299,7 @@ Consider context and provide the most natural English equivalent."""
     def get_suggestions(self, current_input: str, mode: str) -> List[str]:
         """Get contextual suggestions for next likely input"""
         if mode == "speech_to_sign":
-            # Common phrases after current input
-            suggestions_map = {
-                "hello": ["How are you?", "Nice to meet you", "What's your name?"],
-                "thank": ["You're welcome", "I appreciate it", "No problem"],
-                "how": ["How are you?", "How can I help?", "How much?"],
-                "": ["Hello", "Thank you", "Please help me"]  # Default
-            }
-            
-            for key in suggestions_map:
-                if key in current_input.lower():
-                    return suggestions_map[key]
-            return suggestions_map[""]
+            return _SUGGESTIONS[_SUGGESTION_INDEX.first_match(current_input.lower()) or ""]
         
         else:  # sign_to_speech mode
-            # Common sign sequences
-            return ["thank_you", "yes", "no", "help", "please"]
\ No newline at end of file
+            return _SIGN_SUGGESTIONS
\ No newline at end of file
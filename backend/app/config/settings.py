@@ -1,39 +1,64 @@
 import os
+from dataclasses import dataclass
+from typing import Mapping, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
+def _flag(env: Mapping[str, str], name: str, default: str) -> bool:
+    return env.get(name, default).lower() == "true"
+
+@dataclass(frozen=True)
 class Settings:
     # API Keys
-    CEREBRAS_API_KEY = os.getenv("CEREBRAS_API_KEY", "")
+    CEREBRAS_API_KEY: str = ""
     
     # Server Configuration
-    HOST = os.getenv("HOST", "0.0.0.0")
-    PORT = int(os.getenv("PORT", 8000))
-    RELOAD = os.getenv("RELOAD", "true").lower() == "true"
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    RELOAD: bool = True
     
     # CORS Settings
-    CORS_ORIGINS = [
+    CORS_ORIGINS: Tuple[str, ...] = (
         "http://localhost:3000",
         "http://localhost:3001",
         "http://localhost:8000"
-    ]
+    )
     
     # WebSocket Settings
-    WS_HEARTBEAT_INTERVAL = int(os.getenv("WS_HEARTBEAT_INTERVAL", 30))
-    WS_MAX_CONNECTIONS = int(os.getenv("WS_MAX_CONNECTIONS", 100))
+    WS_HEARTBEAT_INTERVAL: int = 30
+    WS_MAX_CONNECTIONS: int = 100
     
     # Audio Settings
-    AUDIO_SAMPLE_RATE = int(os.getenv("AUDIO_SAMPLE_RATE", 16000))
-    AUDIO_CHANNELS = int(os.getenv("AUDIO_CHANNELS", 1))
+    AUDIO_SAMPLE_RATE: int = 16000
+    AUDIO_CHANNELS: int = 1
     
     # Video Settings
-    VIDEO_WIDTH = int(os.getenv("VIDEO_WIDTH", 640))
-    VIDEO_HEIGHT = int(os.getenv("VIDEO_HEIGHT", 480))
-    VIDEO_FPS = int(os.getenv("VIDEO_FPS", 30))
+    VIDEO_WIDTH: int = 640
+    VIDEO_HEIGHT: int = 480
+    VIDEO_FPS: int = 30
     
     # Feature Flags
-    ENABLE_MOCK_MODE = os.getenv("ENABLE_MOCK_MODE", "false").lower() == "true"
-    ENABLE_PERFORMANCE_LOGGING = os.getenv("ENABLE_PERFORMANCE_LOGGING", "true").lower() == "true"
+    ENABLE_MOCK_MODE: bool = False
+    ENABLE_PERFORMANCE_LOGGING: bool = True
+    
+    @classmethod
+    def from_env(cls, env: Mapping[str, str]) -> "Settings":
+        """Build settings from one snapshot of the environment"""
+        return cls(
+            CEREBRAS_API_KEY=env.get("CEREBRAS_API_KEY", ""),
+            HOST=env.get("HOST", "0.0.0.0"),
+            PORT=int(env.get("PORT", 8000)),
+            RELOAD=_flag(env, "RELOAD", "true"),
+            WS_HEARTBEAT_INTERVAL=int(env.get("WS_HEARTBEAT_INTERVAL", 30)),
+            WS_MAX_CONNECTIONS=int(env.get("WS_MAX_CONNECTIONS", 100)),
+            AUDIO_SAMPLE_RATE=int(env.get("AUDIO_SAMPLE_RATE", 16000)),
+            AUDIO_CHANNELS=int(env.get("AUDIO_CHANNELS", 1)),
+            VIDEO_WIDTH=int(env.get("VIDEO_WIDTH", 640)),
+            VIDEO_HEIGHT=int(env.get("VIDEO_HEIGHT", 480)),
+            VIDEO_FPS=int(env.get("VIDEO_FPS", 30)),
+            ENABLE_MOCK_MODE=_flag(env, "ENABLE_MOCK_MODE", "false"),
+            ENABLE_PERFORMANCE_LOGGING=_flag(env, "ENABLE_PERFORMANCE_LOGGING", "true")
+        )
 
-settings = Settings()
+settings = Settings.from_env(dict(os.environ))
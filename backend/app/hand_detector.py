@@ -2,95 +2,160 @@ import cv2
 import mediapipe as mp
 import numpy as np
 from typing import List, Dict, Tuple, Optional
-import base64
-from io import BytesIO
-from PIL import Image
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Try to import pybase64 for SIMD base64 decoding
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+from .landmark_processor import as_points
+
+# Thumb, index, middle, ring, pinky tip indices
+_FINGERTIPS = [4, 8, 12, 16, 20]
+
+def pack_landmarks(landmarks: np.ndarray, dtype: str = '<f2') -> str:
+    """
+    Encode a (num_hands, 21, 3) landmark array for the wire
+    
+    Returns base64 of the little-endian buffer, float16 by default (126 bytes
+    per hand; normalized coordinates keep ~3 significant digits, finer than a
+    pixel). Clients rebuild it with Float16Array (or expand uint16 halves to
+    float32) and reshape to (-1, 21, 3).
+    """
+    return base64.b64encode(np.ascontiguousarray(landmarks, dtype=dtype).tobytes()).decode()
 
 class HandDetector:
-    def __init__(self):
+    def __init__(self, prefetch: int = 2, model_complexity: int = 0, max_pending_feeds: int = 4):
+        """
+        Args:
+            prefetch: Frames allowed to queue for the MediaPipe thread before callers wait
+            model_complexity: MediaPipe hand model (0 = lite, about 2x faster; 1 = full)
+            max_pending_feeds: I3D/ensemble frame jobs allowed in flight before frames are dropped
+        """
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
+        self.model_complexity = model_complexity
+        # One Hands graph per thread; graphs are stateful and not thread-safe
+        self._tls = threading.local()
         self.mp_drawing = mp.solutions.drawing_utils
         self.translation_engine = None  # Will be set by main app
-        
+        # Async detection runs on one dedicated thread so its graph sees
+        # frames in order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mediapipe")
+        self._inflight = asyncio.Semaphore(prefetch)
+        # Loop that runs the translation engine; frames are handed to it
+        # thread-safely from whichever thread detects
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._feed_slots = threading.BoundedSemaphore(max_pending_feeds)
+        
+    @property
+    def hands(self):
+        """MediaPipe Hands graph owned by the calling thread"""
+        hands = getattr(self._tls, "hands", None)
+        if hands is None:
+            hands = self._tls.hands = self.mp_hands.Hands(
+                static_image_mode=False,
+                max_num_hands=2,
+                model_complexity=self.model_complexity,
+                min_detection_confidence=0.7,
+                min_tracking_confidence=0.5
+            )
+        return hands
+    
     def decode_base64_image(self, base64_string: str) -> np.ndarray:
-        """Convert base64 string to numpy array"""
-        img_data = base64.b64decode(base64_string.split(',')[1])
-        img = Image.open(BytesIO(img_data))
-        return cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+        """Convert base64 string (optionally a data URL) to a BGR numpy array"""
+        _, _, payload = base64_string.rpartition(',')
+        img_data = base64.b64decode(payload)
+        return self.decode_image_bytes(img_data)
+    
+    def decode_image_bytes(self, img_data: bytes) -> np.ndarray:
+        """Decode JPEG/PNG bytes straight to BGR"""
+        image = cv2.imdecode(np.frombuffer(img_data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Could not decode image data")
+        return image
     
     def detect_hands(self, image: np.ndarray) -> Dict:
         """Detect hands and extract landmarks"""
-        # Send frame to I3D processing if translation engine is available
-        if self.translation_engine:
-            import asyncio
-            try:
-                # Process frame asynchronously without blocking
-                asyncio.create_task(self.translation_engine.process_video_frame(image))
-                # Also process for ensemble if enabled
-                asyncio.create_task(self.translation_engine.process_video_frame_ensemble(image))
-            except Exception as e:
-                # Silently handle errors to not disrupt main flow
-                pass
-        
+        self._feed_translation_engine(image)
+        return self._detect(image)
+    
+    def set_loop(self, loop: asyncio.AbstractEventLoop):
+        """Set the event loop that I3D / ensemble frame processing runs on"""
+        self._loop = loop
+    
+    async def detect_hands_async(self, image: np.ndarray) -> Dict:
+        """Detect hands on the MediaPipe thread, keeping the event loop free"""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        self._feed_translation_engine(image)
+        async with self._inflight:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._detect, image)
+    
+    def close(self):
+        """Stop the MediaPipe thread"""
+        self._executor.shutdown(wait=False)
+    
+    def _feed_translation_engine(self, image: np.ndarray):
+        """Send frame to I3D / ensemble processing if translation engine is available"""
+        if not self.translation_engine or self._loop is None:
+            return
+        
+        for process in (self.translation_engine.process_video_frame,
+                        self.translation_engine.process_video_frame_ensemble):
+            # Back-pressure: drop the frame if the models are falling behind
+            if not self._feed_slots.acquire(blocking=False):
+                return
+            future = asyncio.run_coroutine_threadsafe(process(image), self._loop)
+            # Errors are ignored so they don't disrupt the main flow
+            future.add_done_callback(lambda _: self._feed_slots.release())
+    
+    def _detect(self, image: np.ndarray) -> Dict:
+        """Run MediaPipe on one BGR frame"""
+        # MediaPipe needs contiguous RGB, so a reversed-channel view won't do;
+        # marking the converted frame read-only lets it be passed by
+        # reference instead of copied again inside MediaPipe
         image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        image_rgb.flags.writeable = False
         results = self.hands.process(image_rgb)
         
         hand_data = {
             "hands_detected": False,
             "num_hands": 0,
-            "landmarks": [],
+            # (num_hands, 21, 3) array of normalized x, y, z
+            "landmarks": np.empty((0, 21, 3), dtype=np.float32),
             "handedness": []
         }
         
         if results.multi_hand_landmarks:
             hand_data["hands_detected"] = True
             hand_data["num_hands"] = len(results.multi_hand_landmarks)
+            hand_data["landmarks"] = np.array(
+                [[(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark]
+                 for hand_landmarks in results.multi_hand_landmarks],
+                dtype=np.float32
+            )
             
-            for hand_idx, hand_landmarks in enumerate(results.multi_hand_landmarks):
-                # Extract normalized landmarks
-                landmarks = []
-                for landmark in hand_landmarks.landmark:
-                    landmarks.append({
-                        "x": landmark.x,
-                        "y": landmark.y,
-                        "z": landmark.z
-                    })
-                hand_data["landmarks"].append(landmarks)
-                
-                # Get handedness (left/right)
-                if results.multi_handedness:
-                    handedness = results.multi_handedness[hand_idx].classification[0].label
-                    hand_data["handedness"].append(handedness)
+            # Get handedness (left/right)
+            if results.multi_handedness:
+                hand_data["handedness"] = [
+                    handedness.classification[0].label
+                    for handedness in results.multi_handedness
+                ]
         
         return hand_data
     
-    def extract_features(self, landmarks: List[Dict]) -> np.ndarray:
+    def extract_features(self, landmarks: np.ndarray) -> np.ndarray:
         """Extract feature vector from hand landmarks"""
-        features = []
+        points = as_points(landmarks)
         
-        # Calculate relative positions and angles
-        for i, landmark in enumerate(landmarks):
-            features.extend([landmark["x"], landmark["y"], landmark["z"]])
-            
-        # Add relative distances between key points
-        # Wrist to fingertips distances
-        wrist = landmarks[0]
-        for tip_idx in [4, 8, 12, 16, 20]:  # Fingertip indices
-            tip = landmarks[tip_idx]
-            distance = np.sqrt(
-                (tip["x"] - wrist["x"])**2 + 
-                (tip["y"] - wrist["y"])**2 + 
-                (tip["z"] - wrist["z"])**2
-            )
-            features.append(distance)
-        
-        return np.array(features)
+        # Raw coordinates plus wrist-to-fingertip distances
+        distances = np.linalg.norm(points[_FINGERTIPS] - points[0], axis=1)
+        return np.concatenate([points.ravel(), distances])
     
     def draw_landmarks(self, image: np.ndarray, hand_data: Dict) -> np.ndarray:
         """Draw hand landmarks on image"""
@@ -101,18 +166,18 @@ class HandDetector:
                 # Convert normalized coordinates to pixel coordinates
                 h, w, _ = image.shape
                 for landmark in landmarks:
-                    x = int(landmark["x"] * w)
-                    y = int(landmark["y"] * h)
+                    x = int(landmark[0] * w)
+                    y = int(landmark[1] * h)
                     cv2.circle(annotated_image, (x, y), 5, (0, 255, 0), -1)
         
         return annotated_image
     
     def classify_gesture(self, hand_data: Dict) -> Tuple[str, float]:
         """Classify hand gesture based on landmarks"""
-        if not hand_data["hands_detected"] or not hand_data["landmarks"]:
+        if not hand_data["hands_detected"] or len(hand_data["landmarks"]) == 0:
             return "none", 0.0
             
-        landmarks = hand_data["landmarks"][0]  # Use first hand
+        landmarks = as_points(hand_data["landmarks"][0])  # Use first hand
         
         # Simple gesture classification based on finger positions
         # This is a simplified version for demo purposes
@@ -121,7 +186,7 @@ class HandDetector:
         
         return gesture, confidence
     
-    def _identify_gesture(self, landmarks: List[Dict]) -> str:
+    def _identify_gesture(self, landmarks: np.ndarray) -> str:
         """Identify specific gestures based on landmark positions"""
         # Calculate finger states (extended or folded)
         finger_states = self._get_finger_states(landmarks)
@@ -141,52 +206,37 @@ class HandDetector:
         else:
             return "hello"  # Default
     
-    def _get_finger_states(self, landmarks: List[Dict]) -> List[bool]:
+    def _get_finger_states(self, landmarks: np.ndarray) -> List[bool]:
         """Determine if each finger is extended or folded"""
-        # Landmark indices for fingertips and bases
-        tips = [4, 8, 12, 16, 20]  # Thumb, Index, Middle, Ring, Pinky tips
-        bases = [2, 5, 9, 13, 17]  # Corresponding base joints
-        
-        finger_states = []
-        wrist_y = landmarks[0]["y"]
+        # Plain floats: indexing numpy scalars one by one costs more than the
+        # comparisons themselves
+        x = landmarks[:, 0].tolist()
+        y = landmarks[:, 1].tolist()
         
-        for tip_idx, base_idx in zip(tips, bases):
-            tip_y = landmarks[tip_idx]["y"]
-            base_y = landmarks[base_idx]["y"]
-            
-            # Finger is extended if tip is higher (smaller y) than base
-            # For thumb, use x-coordinate as well
-            if tip_idx == 4:  # Thumb
-                is_extended = abs(landmarks[tip_idx]["x"] - landmarks[base_idx]["x"]) > 0.1
-            else:
-                is_extended = tip_y < base_y
-                
-            finger_states.append(is_extended)
-        
-        return finger_states
+        # [thumb, index, middle, ring, pinky]
+        # Thumb is judged on horizontal spread from its base; other fingers are
+        # extended if the tip is higher (smaller y) than the base joint
+        return [
+            abs(x[4] - x[2]) > 0.1,
+            y[8] < y[5],
+            y[12] < y[9],
+            y[16] < y[13],
+            y[20] < y[17]
+        ]
     
-    def calculate_motion_level(self, current_landmarks: List[Dict], previous_landmarks: Optional[List[Dict]] = None) -> float:
+    def calculate_motion_level(self, current_landmarks: np.ndarray, previous_landmarks: Optional[np.ndarray] = None) -> float:
         """Calculate motion level between frames"""
-        if previous_landmarks is None or not current_landmarks:
+        if previous_landmarks is None or len(current_landmarks) == 0:
             return 0.0
             
-        total_motion = 0.0
-        
-        for i in range(min(len(current_landmarks), len(previous_landmarks))):
-            curr = current_landmarks[i]
-            prev = previous_landmarks[i]
-            
-            motion = np.sqrt(
-                (curr["x"] - prev["x"])**2 + 
-                (curr["y"] - prev["y"])**2 + 
-                (curr["z"] - prev["z"])**2
-            )
-            total_motion += motion
-        
-        # Normalize by number of landmarks
+        # Mean per-landmark displacement
+        current = as_points(current_landmarks)
+        previous = as_points(previous_landmarks)
+        n = min(len(current), len(previous))
+        total_motion = np.linalg.norm(current[:n] - previous[:n], axis=1).sum()
         avg_motion = total_motion / len(current_landmarks)
         
         # Scale to 0-1 range (adjust threshold as needed)
         normalized_motion = min(1.0, avg_motion * 10)
         
-        return normalized_motion
\ No newline at end of file
+        return float(normalized_motion)
\ No newline at end of file
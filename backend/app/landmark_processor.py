@@ -3,11 +3,123 @@ Advanced landmark processing for sign language recognition
 Uses statistical analysis and pattern matching instead of LLMs
 """
 
+import math
 import numpy as np
-from typing import List, Dict, Tuple, Optional
-from collections import deque
+from typing import List, Dict, Tuple, Optional, Union
+from collections import Counter, deque
+from enum import IntEnum
 import json
 
+# Try to import numba to JIT-compile the per-frame geometry
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernels run as plain Python"""
+        def decorator(func):
+            return func
+        return decorator
+
+def as_points(landmarks: Union[np.ndarray, List[Dict]]) -> np.ndarray:
+    """Return landmarks as a (21, 3) float32 array, converting [{x, y, z}, ...] input"""
+    if isinstance(landmarks, np.ndarray):
+        return np.asarray(landmarks, dtype=np.float32)
+    return np.array([[l['x'], l['y'], l['z']] for l in landmarks], dtype=np.float32)
+
+class ThumbPosition(IntEnum):
+    """Thumb placement; the first five are what _hand_geometry can measure"""
+    ACROSS = 0
+    TOUCHING_INDEX = 1
+    TOUCHING_MIDDLE = 2
+    TUCKED = 3
+    EXTENDED = 4
+    # Only referenced by patterns
+    SIDE = 5
+    CURVED = 6
+    ACROSS_FINGERS = 7
+    CIRCLE = 8
+
+# Measured features, in the column order used for pattern ranges
+_ANGLE_FEATURES = ('thumb_to_index', 'index_to_middle')
+_DISTANCE_FEATURES = ('thumb_to_index', 'thumb_to_middle', 'finger_spread', 'fingers_together')
+
+# Landmark pairs behind the key distances: thumb-index, thumb-middle, then
+# the adjacent fingertip gaps index-middle, middle-ring, ring-pinky
+_KEY_DISTANCE_PAIRS = ((4, 8), (4, 12), (8, 12), (12, 16), (16, 20))
+
+@njit(cache=True, error_model='numpy')
+def _dist(p, a, b):
+    """Euclidean distance between landmarks a and b"""
+    dx = p[a][0] - p[b][0]
+    dy = p[a][1] - p[b][1]
+    dz = p[a][2] - p[b][2]
+    return math.sqrt(dx * dx + dy * dy + dz * dz)
+
+@njit(cache=True, error_model='numpy')
+def _angle(p, a, b, c):
+    """Angle at landmark b between a and c, in degrees (nan if degenerate)"""
+    v1x = p[a][0] - p[b][0]
+    v1y = p[a][1] - p[b][1]
+    v1z = p[a][2] - p[b][2]
+    v2x = p[c][0] - p[b][0]
+    v2y = p[c][1] - p[b][1]
+    v2z = p[c][2] - p[b][2]
+    denom = math.sqrt(v1x * v1x + v1y * v1y + v1z * v1z) * math.sqrt(v2x * v2x + v2y * v2y + v2z * v2z)
+    if denom == 0.0:
+        return math.nan
+    cos_angle = min(1.0, max(-1.0, (v1x * v2x + v1y * v2y + v1z * v2z) / denom))
+    return math.degrees(math.acos(cos_angle))
+
+@njit(cache=True, error_model='numpy')
+def _finger_extended(p, tip, pip, mcp):
+    """Finger is extended if straight and tip is higher"""
+    return _angle(p, mcp, pip, tip) > 160 and p[tip][1] < p[pip][1] + 0.02
+
+@njit(cache=True, error_model='numpy')
+def _hand_geometry(p):
+    """
+    Compute all per-frame features from (21, 3) points in one pass
+    
+    Returns:
+        (finger states [thumb..pinky], (thumb_to_index, index_to_middle) angles,
+         (thumb_to_index, thumb_to_middle, finger_spread, fingers_together) distances,
+         ThumbPosition value)
+    """
+    # Thumb is extended if its tip is away from the index base
+    thumb_extended = _dist(p, 4, 5) > _dist(p, 1, 5) * 0.8
+    states = (
+        thumb_extended,
+        _finger_extended(p, 8, 6, 5),
+        _finger_extended(p, 12, 10, 9),
+        _finger_extended(p, 16, 14, 13),
+        _finger_extended(p, 20, 18, 17)
+    )
+    
+    angles = (_angle(p, 4, 0, 8), _angle(p, 8, 5, 12))
+    
+    # Each pair is measured once; finger_spread doubles as the first
+    # fingertip gap of fingers_together
+    d = [_dist(p, a, b) for a, b in _KEY_DISTANCE_PAIRS]
+    thumb_to_index = d[0]
+    thumb_to_middle = d[1]
+    distances = (thumb_to_index, thumb_to_middle, d[2], (d[2] + d[3] + d[4]) / 3.0)
+    
+    if _dist(p, 4, 17) < _dist(p, 4, 5) * 0.7:
+        thumb_code = ThumbPosition.ACROSS  # across the palm
+    elif thumb_to_index < 0.04:
+        thumb_code = ThumbPosition.TOUCHING_INDEX
+    elif thumb_to_middle < 0.04:
+        thumb_code = ThumbPosition.TOUCHING_MIDDLE
+    elif _dist(p, 4, 1) < 0.05:
+        thumb_code = ThumbPosition.TUCKED
+    else:
+        thumb_code = ThumbPosition.EXTENDED
+    
+    return states, angles, distances, thumb_code
+
 class LandmarkProcessor:
     """Process hand landmarks for better gesture recognition"""
     
@@ -37,111 +149,120 @@ class LandmarkProcessor:
         
         # Gesture history for temporal analysis
         self.gesture_history = deque(maxlen=30)  # 1 second at 30fps
+        # Only the last 10 frames are used for smoothing; counts and
+        # confidence sums are kept in step with that window
+        self._smoothing_window = 10
+        self._gesture_counts = Counter()
+        self._confidence_sums = Counter()
         
         # Pre-computed ASL patterns
         self.asl_patterns = self._load_asl_patterns()
+        self._compile_patterns()
+        
+        # Reused buffer for landmarks that arrive as [{x, y, z}, ...]
+        self._pts = np.empty((21, 3), dtype=np.float32)
         
     def _load_asl_patterns(self) -> Dict:
         """Load pre-computed patterns for ASL letters"""
         return {
             'A': {
                 'finger_states': [False, False, False, False, False],  # All closed
-                'thumb_position': 'side',
+                'thumb_position': ThumbPosition.SIDE,
                 'key_angles': {'thumb_to_index': (30, 90)},
                 'key_distances': {}
             },
             'B': {
                 'finger_states': [False, True, True, True, True],  # Fingers extended
-                'thumb_position': 'across',
+                'thumb_position': ThumbPosition.ACROSS,
                 'key_angles': {},
                 'key_distances': {'fingers_together': (0, 0.03)}
             },
             'C': {
                 'finger_states': [False, False, False, False, False],
-                'thumb_position': 'curved',
+                'thumb_position': ThumbPosition.CURVED,
                 'key_angles': {},
                 'key_distances': {'thumb_to_fingers': (0.08, 0.15)}
             },
             'D': {
                 'finger_states': [False, True, False, False, False],  # Index up
-                'thumb_position': 'touching_middle',
+                'thumb_position': ThumbPosition.TOUCHING_MIDDLE,
                 'key_angles': {},
                 'key_distances': {'thumb_to_middle': (0, 0.03)}
             },
             'E': {
                 'finger_states': [False, False, False, False, False],
-                'thumb_position': 'across_fingers',
+                'thumb_position': ThumbPosition.ACROSS_FINGERS,
                 'key_angles': {},
                 'key_distances': {'thumb_to_fingers': (0, 0.04)}
             },
             'F': {
                 'finger_states': [False, False, True, True, True],  # OK sign
-                'thumb_position': 'touching_index',
+                'thumb_position': ThumbPosition.TOUCHING_INDEX,
                 'key_angles': {},
                 'key_distances': {'thumb_to_index': (0, 0.03)}
             },
             'I': {
                 'finger_states': [False, False, False, False, True],  # Pinky up
-                'thumb_position': 'tucked',
+                'thumb_position': ThumbPosition.TUCKED,
                 'key_angles': {},
                 'key_distances': {}
             },
             'L': {
                 'finger_states': [True, True, False, False, False],  # L shape
-                'thumb_position': 'extended',
+                'thumb_position': ThumbPosition.EXTENDED,
                 'key_angles': {'thumb_to_index': (70, 110)},
                 'key_distances': {}
             },
             'O': {
                 'finger_states': [False, False, False, False, False],
-                'thumb_position': 'circle',
+                'thumb_position': ThumbPosition.CIRCLE,
                 'key_angles': {},
                 'key_distances': {'thumb_to_index': (0, 0.04), 'circle_gap': (0, 0.02)}
             },
             'V': {
                 'finger_states': [False, True, True, False, False],  # Peace sign
-                'thumb_position': 'tucked',
+                'thumb_position': ThumbPosition.TUCKED,
                 'key_angles': {'index_to_middle': (20, 60)},
                 'key_distances': {'finger_spread': (0.05, 0.15)}
             },
             'Y': {
                 'finger_states': [True, False, False, False, True],  # Hang loose
-                'thumb_position': 'extended',
+                'thumb_position': ThumbPosition.EXTENDED,
                 'key_angles': {},
                 'key_distances': {}
             }
         }
     
-    def process_landmarks(self, landmarks: List[Dict]) -> Dict[str, any]:
+    def process_landmarks(self, landmarks: Union[np.ndarray, List[Dict]]) -> Dict[str, any]:
         """Process landmarks and return recognized gesture with confidence"""
-        if not landmarks or len(landmarks) != 21:
+        if landmarks is None or len(landmarks) != 21:
             return {"gesture": "Unknown", "confidence": 0.0}
         
-        # Convert to numpy array for easier processing
-        points = np.array([[l['x'], l['y'], l['z']] for l in landmarks])
-        
-        # Extract features
-        finger_states = self._get_finger_states(points)
-        thumb_position = self._get_thumb_position(points)
-        key_angles = self._calculate_key_angles(points)
-        key_distances = self._calculate_key_distances(points)
-        
-        # Match against patterns
-        best_match = None
-        best_confidence = 0.0
+        if isinstance(landmarks, np.ndarray):
+            # float32 throughout; the matching windows are far wider than
+            # its precision, and numba compiles a single specialization
+            points = np.ascontiguousarray(landmarks, dtype=np.float32)
+        else:
+            points = self._pts
+            for i, l in enumerate(landmarks):
+                points[i] = (l['x'], l['y'], l['z'])
         
-        for letter, pattern in self.asl_patterns.items():
-            confidence = self._match_pattern(
-                finger_states, thumb_position, key_angles, key_distances,
-                pattern
-            )
-            
-            if confidence > best_confidence:
-                best_confidence = confidence
-                best_match = letter
+        # Extract features (plain lists are faster than arrays without numba)
+        states, angles, distances, thumb_code = _hand_geometry(
+            points if NUMBA_AVAILABLE else points.tolist()
+        )
+        # Match against all patterns at once
+        scores = self._score_patterns(states, thumb_code, angles + distances)
+        best = int(scores.argmax())
+        if scores[best] > 0.0:
+            best_match = self._pattern_letters[best]
+            best_confidence = float(scores[best])
+        else:
+            best_match = None
+            best_confidence = 0.0
         
         # Use temporal smoothing
-        self.gesture_history.append((best_match, best_confidence))
+        self._record_gesture(best_match, best_confidence)
         smoothed_result = self._temporal_smoothing()
         
         return {
@@ -151,205 +272,89 @@ class LandmarkProcessor:
             "raw_confidence": best_confidence
         }
     
-    def _get_finger_states(self, points: np.ndarray) -> List[bool]:
-        """Determine if each finger is extended"""
-        states = []
-        
-        # Thumb (special case)
-        thumb_extended = self._is_thumb_extended(points)
-        states.append(thumb_extended)
-        
-        # Other fingers
-        finger_tips = [self.INDEX_TIP, self.MIDDLE_TIP, self.RING_TIP, self.PINKY_TIP]
-        finger_pips = [self.INDEX_PIP, self.MIDDLE_PIP, self.RING_PIP, self.PINKY_PIP]
-        finger_mcps = [self.INDEX_MCP, self.MIDDLE_MCP, self.RING_MCP, self.PINKY_MCP]
-        
-        for tip, pip, mcp in zip(finger_tips, finger_pips, finger_mcps):
-            extended = self._is_finger_extended(points, tip, pip, mcp)
-            states.append(extended)
-        
-        return states
-    
-    def _is_thumb_extended(self, points: np.ndarray) -> bool:
-        """Check if thumb is extended"""
-        thumb_tip = points[self.THUMB_TIP]
-        thumb_cmc = points[self.THUMB_CMC]
-        index_mcp = points[self.INDEX_MCP]
-        
-        # Distance from tip to index base
-        dist_to_index = np.linalg.norm(thumb_tip - index_mcp)
-        base_dist = np.linalg.norm(thumb_cmc - index_mcp)
-        
-        return dist_to_index > base_dist * 0.8
-    
-    def _is_finger_extended(self, points: np.ndarray, tip: int, pip: int, mcp: int) -> bool:
-        """Check if a finger is extended"""
-        # Calculate angles
-        angle1 = self._calculate_angle(points[mcp], points[pip], points[tip])
-        
-        # Check vertical position
-        tip_y = points[tip][1]
-        pip_y = points[pip][1]
-        
-        # Finger is extended if straight and tip is higher
-        return angle1 > 160 and tip_y < pip_y + 0.02
-    
-    def _get_thumb_position(self, points: np.ndarray) -> str:
-        """Determine thumb position relative to hand"""
-        thumb_tip = points[self.THUMB_TIP]
-        thumb_cmc = points[self.THUMB_CMC]
-        index_mcp = points[self.INDEX_MCP]
-        middle_mcp = points[self.MIDDLE_MCP]
-        pinky_mcp = points[self.PINKY_MCP]
-        
-        # Check various positions
-        if self._is_thumb_across_palm(points):
-            return 'across'
-        elif self._is_thumb_touching_finger(points, self.INDEX_TIP):
-            return 'touching_index'
-        elif self._is_thumb_touching_finger(points, self.MIDDLE_TIP):
-            return 'touching_middle'
-        elif np.linalg.norm(thumb_tip - thumb_cmc) < 0.05:
-            return 'tucked'
-        else:
-            return 'extended'
+    def _compile_patterns(self):
+        """Lay asl_patterns out as arrays so every letter is scored in one pass"""
+        letters = list(self.asl_patterns)
+        n = len(letters)
+        columns = [('key_angles', name) for name in _ANGLE_FEATURES] + \
+                  [('key_distances', name) for name in _DISTANCE_FEATURES]
+        
+        self._pattern_letters = letters
+        self._pattern_states = np.array([self.asl_patterns[l]['finger_states'] for l in letters], dtype=bool)
+        self._pattern_thumbs = np.array([self.asl_patterns[l]['thumb_position'] for l in letters])
+        # nan bounds mark checks a pattern doesn't use (ranges on features
+        # that are never measured are skipped, as before)
+        self._pattern_lo = np.full((n, len(columns)), np.nan)
+        self._pattern_hi = np.full((n, len(columns)), np.nan)
+        for i, letter in enumerate(letters):
+            for j, (group, name) in enumerate(columns):
+                bounds = self.asl_patterns[letter].get(group, {}).get(name)
+                if bounds is not None:
+                    self._pattern_lo[i, j], self._pattern_hi[i, j] = bounds
+        self._pattern_used = ~np.isnan(self._pattern_lo)
+        
+        # The pattern table is fixed, so everything but the per-frame
+        # comparisons is folded in here. The denominator only depends on
+        # which checks a pattern uses.
+        checks = np.full(n, 0.4 + 0.3)
+        for j in range(len(columns)):
+            checks += self._pattern_used[:, j] * 0.15
+        self._pattern_checks = checks
+        # The numerator only depends on (finger matches, thumb match, range
+        # checks passed); tabulate it with the same left-to-right additions
+        # as a per-letter sum so scores stay bit-identical
+        table = np.empty((6, 2, len(columns) + 1))
+        for matches in range(6):
+            for thumb_ok in range(2):
+                total = (matches / 5) * 0.4 + thumb_ok * 0.3
+                for passed in range(len(columns) + 1):
+                    table[matches, thumb_ok, passed] = total
+                    total += 0.15
+        self._score_table = table
     
-    def _is_thumb_across_palm(self, points: np.ndarray) -> bool:
-        """Check if thumb is across the palm"""
-        thumb_tip = points[self.THUMB_TIP]
-        pinky_mcp = points[self.PINKY_MCP]
-        index_mcp = points[self.INDEX_MCP]
-        
-        thumb_to_pinky = np.linalg.norm(thumb_tip - pinky_mcp)
-        thumb_to_index = np.linalg.norm(thumb_tip - index_mcp)
-        
-        return thumb_to_pinky < thumb_to_index * 0.7
+    def _score_patterns(self, finger_states: Tuple[bool, ...], thumb_code: int,
+                        features: Tuple[float, ...]) -> np.ndarray:
+        """Confidence of each pattern: weighted fraction of its checks that pass"""
+        matches = (self._pattern_states == np.array(finger_states)).sum(axis=1)
+        thumb_ok = (self._pattern_thumbs == thumb_code).astype(np.intp)
+        values = np.array(features)
+        passed = ((self._pattern_lo <= values) & (values <= self._pattern_hi)).sum(axis=1)
+        return self._score_table[matches, thumb_ok, passed] / self._pattern_checks
     
-    def _is_thumb_touching_finger(self, points: np.ndarray, finger_tip: int) -> bool:
-        """Check if thumb is touching a specific finger"""
-        distance = np.linalg.norm(points[self.THUMB_TIP] - points[finger_tip])
-        return distance < 0.04
-    
-    def _calculate_angle(self, p1: np.ndarray, p2: np.ndarray, p3: np.ndarray) -> float:
-        """Calculate angle between three points"""
-        v1 = p1 - p2
-        v2 = p3 - p2
-        
-        cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
-        angle = np.arccos(np.clip(cos_angle, -1, 1))
-        
-        return np.degrees(angle)
-    
-    def _calculate_key_angles(self, points: np.ndarray) -> Dict[str, float]:
-        """Calculate important angles for gesture recognition"""
-        angles = {}
-        
-        # Thumb to index angle
-        angles['thumb_to_index'] = self._calculate_angle(
-            points[self.THUMB_TIP],
-            points[self.WRIST],
-            points[self.INDEX_TIP]
-        )
-        
-        # Index to middle spread
-        angles['index_to_middle'] = self._calculate_angle(
-            points[self.INDEX_TIP],
-            points[self.INDEX_MCP],
-            points[self.MIDDLE_TIP]
-        )
-        
-        return angles
-    
-    def _calculate_key_distances(self, points: np.ndarray) -> Dict[str, float]:
-        """Calculate important distances for gesture recognition"""
-        distances = {}
-        
-        # Thumb to index distance
-        distances['thumb_to_index'] = np.linalg.norm(
-            points[self.THUMB_TIP] - points[self.INDEX_TIP]
-        )
-        
-        # Thumb to middle distance
-        distances['thumb_to_middle'] = np.linalg.norm(
-            points[self.THUMB_TIP] - points[self.MIDDLE_TIP]
-        )
-        
-        # Finger spread (index to middle)
-        distances['finger_spread'] = np.linalg.norm(
-            points[self.INDEX_TIP] - points[self.MIDDLE_TIP]
-        )
-        
-        # Fingers together distance
-        distances['fingers_together'] = np.mean([
-            np.linalg.norm(points[self.INDEX_TIP] - points[self.MIDDLE_TIP]),
-            np.linalg.norm(points[self.MIDDLE_TIP] - points[self.RING_TIP]),
-            np.linalg.norm(points[self.RING_TIP] - points[self.PINKY_TIP])
-        ])
-        
-        return distances
-    
-    def _match_pattern(self, finger_states: List[bool], thumb_position: str,
-                      key_angles: Dict, key_distances: Dict, pattern: Dict) -> float:
-        """Match current hand state against a pattern"""
-        confidence = 0.0
-        checks = 0
-        
-        # Check finger states
-        if 'finger_states' in pattern:
-            expected = pattern['finger_states']
-            matches = sum(1 for e, a in zip(expected, finger_states) if e == a)
-            confidence += (matches / len(expected)) * 0.4
-            checks += 0.4
-        
-        # Check thumb position
-        if 'thumb_position' in pattern:
-            if thumb_position == pattern['thumb_position']:
-                confidence += 0.3
-            checks += 0.3
-        
-        # Check key angles
-        for angle_name, (min_val, max_val) in pattern.get('key_angles', {}).items():
-            if angle_name in key_angles:
-                if min_val <= key_angles[angle_name] <= max_val:
-                    confidence += 0.15
-                checks += 0.15
-        
-        # Check key distances
-        for dist_name, (min_val, max_val) in pattern.get('key_distances', {}).items():
-            if dist_name in key_distances:
-                if min_val <= key_distances[dist_name] <= max_val:
-                    confidence += 0.15
-                checks += 0.15
-        
-        # Normalize confidence
-        if checks > 0:
-            confidence = confidence / checks
-        
-        return confidence
+    def _record_gesture(self, gesture: Optional[str], confidence: float):
+        """Append to the smoothing window, updating running counts"""
+        if len(self.gesture_history) >= self._smoothing_window:
+            old_gesture, old_confidence = self.gesture_history[-self._smoothing_window]
+            self._gesture_counts[old_gesture] -= 1
+            if self._gesture_counts[old_gesture] == 0:
+                del self._gesture_counts[old_gesture]
+                del self._confidence_sums[old_gesture]
+            else:
+                self._confidence_sums[old_gesture] -= old_confidence
+        
+        self.gesture_history.append((gesture, confidence))
+        self._gesture_counts[gesture] += 1
+        self._confidence_sums[gesture] += confidence
     
     def _temporal_smoothing(self) -> Optional[Tuple[str, float]]:
         """Apply temporal smoothing to reduce jitter"""
         if len(self.gesture_history) < 5:
             return None
         
-        # Count occurrences of each gesture in recent history
-        gesture_counts = {}
-        confidence_sum = {}
-        
-        for gesture, confidence in list(self.gesture_history)[-10:]:
-            if gesture not in gesture_counts:
-                gesture_counts[gesture] = 0
-                confidence_sum[gesture] = 0
-            gesture_counts[gesture] += 1
-            confidence_sum[gesture] += confidence
+        # Only return if the most common gesture appears frequently enough
+        top_count = max(self._gesture_counts.values())
+        if top_count < 3:
+            return None
         
-        # Find most common gesture
-        if gesture_counts:
-            best_gesture = max(gesture_counts, key=gesture_counts.get)
-            avg_confidence = confidence_sum[best_gesture] / gesture_counts[best_gesture]
-            
-            # Only return if it appears frequently enough
-            if gesture_counts[best_gesture] >= 3:
-                return (best_gesture, avg_confidence)
+        leaders = [g for g, count in self._gesture_counts.items() if count == top_count]
+        if len(leaders) == 1:
+            best_gesture = leaders[0]
+        else:
+            # Ties go to the gesture seen first in the window
+            history = self.gesture_history
+            best_gesture = next(
+                history[i][0] for i in range(max(0, len(history) - self._smoothing_window), len(history))
+                if history[i][0] in leaders
+            )
         
-        return None
\ No newline at end of file
+        return (best_gesture, self._confidence_sums[best_gesture] / top_count)
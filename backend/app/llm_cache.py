@@ -0,0 +1,251 @@
+"""
+LLM response cache
+Exact-match LRU cache for AI provider translations so repeated phrases
+skip the upstream round-trip, plus an optional embedding-based cache for
+paraphrases (enable with SEMANTIC_CACHE=true)
+"""
+
+import asyncio
+import functools
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+
+from .utils.logger import setup_logger
+
+# Try to import sentence-transformers for the semantic cache
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SentenceTransformer = None
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+logger = setup_logger(__name__)
+
+
+class LLMCache:
+    """Async-safe LRU cache with TTL for translation results"""
+
+    def __init__(self, max_size: int = 512, ttl_seconds: float = 3600):
+        """
+        Initialize cache
+
+        Args:
+            max_size: Maximum number of entries
+            ttl_seconds: Time to live for entries
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(provider: str, model: str, mode: str, text: str,
+                 context: Optional[List[Dict]] = None) -> str:
+        """Build a cache key from the inputs that shape the prompt"""
+        raw = "\x1f".join([
+            provider,
+            model,
+            mode,
+            text.strip().lower(),
+            LLMCache.context_key(context)
+        ])
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def context_key(context: Optional[List[Dict]] = None) -> str:
+        """Digest of the part of the context that reaches the prompt"""
+        # Only type/content of the last few entries reach the prompt;
+        # timestamps would make every key unique
+        context_items = [
+            (ctx.get("type", ""), ctx.get("content", ""))
+            for ctx in (context or [])[-3:]
+        ]
+        return hashlib.blake2b(orjson.dumps(context_items), digest_size=8).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get cached result, or None if missing or expired"""
+        async with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            self.misses += 1
+            return None
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        """Store result in cache, evicting the least recently used entry"""
+        async with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total > 0 else 0,
+            "size": len(self._entries),
+            "max_size": self.max_size
+        }
+
+    def clear(self):
+        """Clear cache"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class SemanticCache:
+    """Nearest-neighbour cache over sentence embeddings for paraphrased inputs"""
+
+    def __init__(self,
+                 model_name: str = "all-MiniLM-L6-v2",
+                 threshold: float = 0.92,
+                 max_size: int = 10000):
+        """
+        Initialize semantic cache
+
+        Args:
+            model_name: sentence-transformers model used for embeddings
+            threshold: Minimum cosine similarity to count as a hit
+            max_size: Maximum entries per namespace (oldest are overwritten)
+        """
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_size = max_size
+        self.enabled = os.getenv("SEMANTIC_CACHE", "false").lower() == "true" and SENTENCE_TRANSFORMERS_AVAILABLE
+        self._model = None
+        self._model_lock = asyncio.Lock()
+        # (provider, model, mode, context key) -> [embedding matrix, responses, filled rows, next write row]
+        self._indexes: Dict[Tuple[str, ...], list] = {}
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    async def _embed(self, text: str) -> np.ndarray:
+        """Encode text to an L2-normalized float32 vector off the event loop"""
+        loop = asyncio.get_running_loop()
+        if self._model is None:
+            # Model load takes seconds; keep it off the loop and do it once
+            async with self._model_lock:
+                if self._model is None:
+                    self._model = await loop.run_in_executor(None, SentenceTransformer, self.model_name)
+        vector = await loop.run_in_executor(
+            None,
+            lambda: self._model.encode(text.strip().lower(), normalize_embeddings=True)
+        )
+        return np.asarray(vector, dtype=np.float32)
+
+    async def get(self, namespace: Tuple[str, ...], text: str) -> Tuple[Optional[Dict[str, Any]], Optional[np.ndarray]]:
+        """Return (cached result or None, query embedding)"""
+        query = await self._embed(text)
+        async with self._lock:
+            index = self._indexes.get(namespace)
+            if index is not None and index[2] > 0:
+                matrix, responses, filled, _ = index
+                sims = matrix[:filled] @ query
+                best = int(sims.argmax())
+                if sims[best] >= self.threshold:
+                    self.hits += 1
+                    return responses[best], query
+            self.misses += 1
+            return None, query
+
+    async def set(self, namespace: Tuple[str, ...], embedding: np.ndarray, value: Dict[str, Any]):
+        """Store a result under its embedding"""
+        async with self._lock:
+            index = self._indexes.get(namespace)
+            if index is None:
+                index = [np.empty((64, embedding.shape[0]), dtype=np.float32), [], 0, 0]
+                self._indexes[namespace] = index
+            matrix, responses, filled, row = index
+
+            # Grow geometrically until max_size, then overwrite oldest rows
+            if row >= matrix.shape[0] and matrix.shape[0] < self.max_size:
+                grown = np.empty((min(matrix.shape[0] * 2, self.max_size), matrix.shape[1]), dtype=np.float32)
+                grown[:filled] = matrix[:filled]
+                matrix = index[0] = grown
+            row = row % matrix.shape[0]
+
+            matrix[row] = embedding
+            if row < len(responses):
+                responses[row] = value
+            else:
+                responses.append(value)
+            index[2] = min(filled + 1, matrix.shape[0])
+            index[3] = row + 1
+
+    def disable(self, error: Exception):
+        """Turn the cache off after a failure so lookups fall through to the provider"""
+        logger.error(f"Semantic cache disabled: {error}")
+        self.enabled = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total > 0 else 0,
+            "size": sum(index[2] for index in self._indexes.values())
+        }
+
+
+llm_cache = LLMCache()
+semantic_cache = SemanticCache()
+
+
+def cached_llm(mode: str):
+    """Cache successful results of a provider's translate_* coroutine"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, text: str, context: List[Dict] = None) -> Dict[str, Any]:
+            provider = type(self).__name__
+            model = getattr(self, "model", "")
+            key = LLMCache.make_key(provider, model, mode, text, context)
+            cached = await llm_cache.get(key)
+            if cached is not None:
+                return dict(cached)
+
+            # Fall back to similarity lookup for paraphrases under the same context
+            namespace = (provider, model, mode, LLMCache.context_key(context))
+            embedding = None
+            if semantic_cache.enabled:
+                try:
+                    cached, embedding = await semantic_cache.get(namespace, text)
+                except Exception as e:
+                    semantic_cache.disable(e)
+                if cached is not None:
+                    await llm_cache.set(key, cached)
+                    return dict(cached)
+
+            result = await func(self, text, context)
+            # Don't pin mock fallbacks from transient upstream errors
+            if result.get("success") and not result.get("fallback"):
+                await llm_cache.set(key, dict(result))
+                if embedding is not None and semantic_cache.enabled:
+                    try:
+                        await semantic_cache.set(namespace, embedding, dict(result))
+                    except Exception as e:
+                        semantic_cache.disable(e)
+            return result
+        return wrapper
+    return decorator
@@ -2,25 +2,34 @@ from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Tuple
+from collections import deque
 import os
-import json
+import orjson
 import asyncio
 import time
+import struct
 from dotenv import load_dotenv
-import base64
 import cv2
 import numpy as np
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+# Try to import pybase64 for SIMD base64 decoding
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 
 # Import our services
-from .hand_detector import HandDetector
+from .hand_detector import HandDetector, pack_landmarks
 from .mode_manager import ModeManager, TranslationMode
 from .translation_engine import TranslationEngine
 from .speech_recognition import SpeechRecognitionService
 from .text_to_speech import TextToSpeechService
 from .replay_service import ReplayService
 from .performance_optimizer import PerformanceOptimizer
+from .ai_providers import AIProvider
 
 load_dotenv()
 
@@ -35,6 +44,11 @@ app.add_middleware(
 )
 
 class TranslationResult(BaseModel):
+    """REST schema only; the WebSocket hot path builds plain dicts"""
+    # Build trusted instances with TranslationResult.model_construct(...)
+    # to skip validation
+    model_config = {"extra": "ignore", "validate_assignment": False}
+    
     gesture_detected: str
     translation: str
     confidence: float
@@ -43,35 +57,219 @@ class TranslationResult(BaseModel):
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.translation_history: List[TranslationResult] = []
+        self.active_connections: Set[WebSocket] = set()
+        # Bounded so a long-running server doesn't grow it without limit
+        self.translation_history: deque = deque(maxlen=1000)
         # Initialize services
-        self.hand_detector = HandDetector()
+        # MediaPipe graphs process one frame at a time, so connections are
+        # spread round-robin over a small pool of detectors
+        self.hand_detector_pool = [HandDetector() for _ in range(4)]
+        self.hand_detector = self.hand_detector_pool[0]
+        self._connection_detectors: Dict[WebSocket, HandDetector] = {}
+        # Each connection's last first-hand landmarks, overwritten in place
+        # each frame; absent until its first detection
+        self.previous_landmarks: Dict[WebSocket, np.ndarray] = {}
+        self._next_detector = 0
         self.mode_manager = ModeManager()
         self.translation_engine = TranslationEngine()
         self.replay_service = ReplayService()
         self.performance_optimizer = PerformanceOptimizer()
         # Link hand detector to translation engine for I3D processing
-        self.hand_detector.translation_engine = self.translation_engine
-        self.previous_landmarks = None
+        for detector in self.hand_detector_pool:
+            detector.translation_engine = self.translation_engine
         self.active_sessions = {}
+        # Per-connection (mode, gesture) key and translation of the sign being
+        # held; dropped on motion, hand loss or a new gesture
+        self.held_translations: Dict[WebSocket, Tuple[tuple, Dict]] = {}
+        # Per-connection inbound queues, filled by one reader task each so the
+        # next frame is received and parsed while the current one is processed
+        self.inbound: Dict[WebSocket, asyncio.Queue] = {}
+        self._readers: Dict[WebSocket, asyncio.Task] = {}
+        # Per-connection outbound queues, drained by one writer task each
+        self.outbound: Dict[WebSocket, asyncio.Queue] = {}
+        self._writers: Dict[WebSocket, asyncio.Task] = {}
+        # JPEG decode and frame resizing run here, off the event loop; also the
+        # loop's default executor once the app starts
+        self.frame_executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 4, thread_name_prefix="frame-decode"
+        )
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
+        self._connection_detectors[websocket] = self.hand_detector_pool[self._next_detector]
+        self._next_detector = (self._next_detector + 1) % len(self.hand_detector_pool)
+        self.inbound[websocket] = asyncio.Queue(maxsize=2)
+        self._readers[websocket] = asyncio.create_task(self._reader(websocket))
+        self.outbound[websocket] = asyncio.Queue()
+        self._writers[websocket] = asyncio.create_task(self._writer(websocket))
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        self.active_connections.discard(websocket)
+        self._connection_detectors.pop(websocket, None)
+        self.previous_landmarks.pop(websocket, None)
+        self.held_translations.pop(websocket, None)
+        inbound = self.inbound.pop(websocket, None)
+        reader = self._readers.pop(websocket, None)
+        if reader is not None:
+            reader.cancel()
+        if inbound is not None:
+            # Wake the endpoint loop if it is still waiting on this connection
+            while inbound.full():
+                inbound.get_nowait()
+            inbound.put_nowait(None)
+        self.outbound.pop(websocket, None)
+        writer = self._writers.pop(websocket, None)
+        if writer is not None:
+            writer.cancel()
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+    def hand_detector_for(self, websocket: WebSocket) -> HandDetector:
+        """Detector assigned to a connection"""
+        return self._connection_detectors.get(websocket, self.hand_detector)
+
+    def queue_message(self, message: Dict, websocket: WebSocket):
+        """Queue a result for the connection's writer without waiting on the socket"""
+        queue = self.outbound.get(websocket)
+        if queue is not None:
+            queue.put_nowait(message)
+
+    async def flush(self, websocket: WebSocket, timeout: float = 1.0):
+        """Wait (bounded) until the writer has sent everything queued so far"""
+        queue = self.outbound.get(websocket)
+        if queue is None:
+            return
+        try:
+            await asyncio.wait_for(queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _reader(self, websocket: WebSocket):
+        """
+        Receive and parse frames into the inbound queue.
+        Parse errors are queued as the exception; None marks the end of the stream.
+        A full queue blocks the reader rather than dropping frames, since each
+        binary frame also carries that interval's audio.
+        """
+        queue = self.inbound[websocket]
+        
+        try:
+            while True:
+                received = await websocket.receive()
+                if received["type"] == "websocket.disconnect":
+                    break
+                try:
+                    if received.get("bytes") is not None:
+                        # Binary frame: raw audio/video bytes, no base64 / JSON wrapping
+                        message = parse_stream_frame(received["bytes"])
+                    else:
+                        message = orjson.loads(received["text"])
+                except Exception as e:
+                    message = e
+                await queue.put(message)
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            print(f"WebSocket reader error: {e}")
+        await queue.put(None)
+    
+    async def _writer(self, websocket: WebSocket):
+        """Send queued results, coalescing whatever piled up into one frame"""
+        queue = self.outbound[websocket]
+        try:
+            while True:
+                parts = await self.performance_optimizer.next_outbound_batch(queue, dumps)
+                # A lone result goes out as-is; a backlog as {"batch": [...]}
+                if len(parts) == 1:
+                    await websocket.send_text(parts[0])
+                else:
+                    await websocket.send_text('{"batch":[' + ",".join(parts) + "]}")
+                for _ in parts:
+                    queue.task_done()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"WebSocket writer error: {e}")
 
 manager = ConnectionManager()
 
+# numpy values in results are serialized natively by orjson
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Key layout of a translation result; copied per frame so the dict is
+# created at full size with the keys in wire order
+_RESPONSE_TEMPLATE = {
+    "type": "translation_result",
+    "timestamp": None,
+    "mode": None,
+    "audio_level": 0.0,
+    "motion_level": 0.0,
+    "hand_data": None,
+    "translation": None,
+    "mode_info": None,
+    "performance": None
+}
+
+def decode_frame(video_bytes: Optional[bytes], video_data: Optional[str]) -> Optional[np.ndarray]:
+    """Decode a raw or base64 frame and scale it for detection (runs in a worker thread)"""
+    if video_bytes is not None:
+        image = manager.hand_detector.decode_image_bytes(video_bytes)
+    elif video_data:
+        # Decode base64 image
+        image = manager.hand_detector.decode_base64_image(video_data)
+    else:
+        return None
+    # Optimize image for performance
+    return manager.performance_optimizer.optimize_video_frame(image)
+
+def dumps(message: Dict) -> str:
+    """Serialize a WebSocket message to JSON text"""
+    return orjson.dumps(message, option=_ORJSON_OPTIONS).decode()
+
+# Binary stream frame: <kind: u8><audio length: u32><video length: u32>
+# followed by raw audio (float32 PCM) and video (JPEG) bytes
+STREAM_FRAME_HEADER = struct.Struct("<BII")
+STREAM_FRAME_KIND = 1
+
+def parse_stream_frame(data: bytes) -> Dict:
+    """Split a binary stream frame into audio/video views without copying"""
+    kind, audio_len, video_len = STREAM_FRAME_HEADER.unpack_from(data)
+    if kind != STREAM_FRAME_KIND:
+        raise ValueError(f"Unknown binary frame kind: {kind}")
+    if STREAM_FRAME_HEADER.size + audio_len + video_len > len(data):
+        raise ValueError("Truncated binary frame")
+    
+    view = memoryview(data)
+    audio_start = STREAM_FRAME_HEADER.size
+    video_start = audio_start + audio_len
+    return {
+        "type": "stream",
+        "audio_bytes": view[audio_start:video_start] if audio_len else None,
+        "video_bytes": view[video_start:video_start + video_len] if video_len else None
+    }
+
+@app.on_event("startup")
+async def startup_event():
+    """Hand the running loop to services that schedule work from threads"""
+    loop = asyncio.get_running_loop()
+    # asyncio.to_thread / run_in_executor(None, ...) share the frame pool
+    # instead of the loop lazily creating its own
+    loop.set_default_executor(manager.frame_executor)
+    for detector in manager.hand_detector_pool:
+        detector.set_loop(loop)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release shared resources on shutdown"""
+    await manager.translation_engine.ai_provider.close()
+    await manager.translation_engine.ensemble_translator.close()
+    for detector in manager.hand_detector_pool:
+        detector.close()
+    manager.frame_executor.shutdown(wait=False)
+    await AIProvider.close_client()
+
 @app.get("/")
 async def get():
     return HTMLResponse("""
@@ -136,28 +334,32 @@ async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
     max_retries = 3
     retry_count = 0
+    inbound = manager.inbound[websocket]
     
     try:
         while True:
             try:
-                # Receive data from client with timeout
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=30.0)
-                message = json.loads(data)
+                # Next parsed frame from the connection's reader, with timeout
+                message = await asyncio.wait_for(inbound.get(), timeout=30.0)
+                if message is None:
+                    raise WebSocketDisconnect(1000)
+                if isinstance(message, Exception):
+                    raise message
                 
                 # Process based on message type
-                result = await process_unified_message(message)
+                result = await process_unified_message(message, websocket)
                 
-                # Send back the result
-                await manager.send_personal_message(json.dumps(result), websocket)
+                # Hand the result to the connection's writer
+                manager.queue_message(result, websocket)
                 
                 # Reset retry count on successful processing
                 retry_count = 0
                 
             except asyncio.TimeoutError:
                 # Send keep-alive ping
-                await websocket.send_json({"type": "ping", "timestamp": datetime.now().isoformat()})
+                manager.queue_message({"type": "ping", "timestamp": datetime.now().isoformat()}, websocket)
                 
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 # Handle invalid JSON
                 error_response = {
                     "type": "error",
@@ -165,7 +367,10 @@ async def websocket_endpoint(websocket: WebSocket):
                     "details": str(e),
                     "timestamp": datetime.now().isoformat()
                 }
-                await websocket.send_json(error_response)
+                manager.queue_message(error_response, websocket)
+                
+            except WebSocketDisconnect:
+                raise
                 
             except Exception as e:
                 retry_count += 1
@@ -178,7 +383,12 @@ async def websocket_endpoint(websocket: WebSocket):
                         "error": "Max retries exceeded",
                         "timestamp": datetime.now().isoformat()
                     }
-                    await websocket.send_json(error_response)
+                    manager.queue_message(error_response, websocket)
+                    await manager.flush(websocket)
+                    try:
+                        await websocket.close(code=1011, reason="Max retries exceeded")
+                    except Exception:
+                        pass
                     break
                     
                 # Send error response and continue
@@ -188,90 +398,147 @@ async def websocket_endpoint(websocket: WebSocket):
                     "retry_count": retry_count,
                     "timestamp": datetime.now().isoformat()
                 }
-                await websocket.send_json(error_response)
+                manager.queue_message(error_response, websocket)
                 
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
     except Exception as e:
         print(f"WebSocket fatal error: {e}")
         try:
             await websocket.close(code=1011, reason="Server error")
         except:
             pass
-        finally:
-            manager.disconnect(websocket)
+    finally:
+        # Every exit path releases the connection's tasks, queues and detector
+        manager.disconnect(websocket)
 
-async def process_unified_message(message: Dict) -> Dict:
+async def process_unified_message(message: Dict, websocket: Optional[WebSocket] = None) -> Dict:
     """Process unified message containing audio and/or video data"""
+    hand_detector = manager.hand_detector_for(websocket)
+    # One timestamp serves every dict built for this frame
+    now_iso = datetime.now().isoformat()
     try:
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         message_type = message.get("type", "unknown")
         
         # Check if we should skip this frame for performance
         if manager.performance_optimizer.should_skip_frame():
             return {
                 "type": "frame_skipped",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso
             }
         
         # Extract audio and video data
         audio_data = message.get("audio")
+        audio_bytes = message.get("audio_bytes")
         video_data = message.get("video")
+        video_bytes = message.get("video_bytes")
+        # Decode base64 audio once; level and translation share the buffer
+        if audio_bytes is None and audio_data:
+            audio_bytes = base64.b64decode(audio_data)
+        
+        # Nothing to process (keep-alive style frame)
+        if not audio_bytes and video_bytes is None and not video_data:
+            return {
+                "type": "noop",
+                "timestamp": now_iso
+            }
         
         # Initialize response
-        response = {
-            "type": "translation_result",
-            "timestamp": datetime.now().isoformat()
-        }
+        response = _RESPONSE_TEMPLATE.copy()
+        response["timestamp"] = now_iso
         
         # Process video frame for hand detection
         hand_data = None
         motion_level = 0.0
-        if video_data:
-            # Decode base64 image
-            image = manager.hand_detector.decode_base64_image(video_data)
-            # Optimize image for performance
-            image = manager.performance_optimizer.optimize_video_frame(image)
-            hand_data = manager.hand_detector.detect_hands(image)
+        image = None
+        if video_bytes is not None or video_data:
+            loop = asyncio.get_running_loop()
+            image = await loop.run_in_executor(manager.frame_executor, decode_frame, video_bytes, video_data)
+        if image is not None:
+            hand_data = await hand_detector.detect_hands_async(image)
             
             # Calculate motion level
-            if hand_data["hands_detected"] and hand_data["landmarks"]:
-                motion_level = manager.hand_detector.calculate_motion_level(
-                    hand_data["landmarks"][0],
-                    manager.previous_landmarks
-                )
-                manager.previous_landmarks = hand_data["landmarks"][0]
+            if hand_data["hands_detected"]:
+                previous = manager.previous_landmarks.get(websocket)
+                motion_level = hand_detector.calculate_motion_level(hand_data["landmarks"][0], previous)
+                if previous is not None:
+                    previous[:] = hand_data["landmarks"][0]
+                elif websocket in manager.active_connections:
+                    manager.previous_landmarks[websocket] = np.array(hand_data["landmarks"][0], dtype=np.float32)
                 
                 # Classify gesture
-                gesture, confidence = manager.hand_detector.classify_gesture(hand_data)
+                gesture, confidence = hand_detector.classify_gesture(hand_data)
                 hand_data["gesture"] = gesture
                 hand_data["gesture_confidence"] = confidence
         
         # Process audio for speech level
         audio_level = 0.0
-        if audio_data:
-            # Convert base64 to bytes
-            audio_bytes = base64.b64decode(audio_data)
+        if audio_bytes:
             # Optimize audio chunk
-            audio_bytes = manager.performance_optimizer.optimize_audio_chunk(audio_bytes)
-            audio_level = manager.translation_engine.speech_service.get_audio_level(audio_bytes)
+            audio_chunk = manager.performance_optimizer.optimize_audio_chunk(audio_bytes)
+            audio_level = manager.translation_engine.speech_service.get_audio_level(audio_chunk)
         
-        # Detect active mode
-        current_mode = await manager.mode_manager.detect_active_mode(
-            audio_level=audio_level,
-            motion_level=motion_level,
-            has_hands=hand_data["hands_detected"] if hand_data else False
-        )
+        # Detect active mode; during the switch cooldown the answer can't
+        # change, so only the level samples are recorded
+        if manager.mode_manager.can_skip_detection():
+            manager.mode_manager.record_levels(audio_level, motion_level)
+            current_mode = manager.mode_manager.current_mode
+        else:
+            current_mode = await manager.mode_manager.detect_active_mode(
+                audio_level=audio_level,
+                motion_level=motion_level,
+                has_hands=hand_data["hands_detected"] if hand_data else False
+            )
+        
+        # A held sign repeats the same gesture frame after frame; reuse this
+        # connection's translation until the hand moves, leaves or changes sign
+        gesture = hand_data.get("gesture") if hand_data else None
+        cache_key = None
+        if current_mode == TranslationMode.SIGN_TO_SPEECH and gesture:
+            cache_key = (current_mode.value, gesture)
+        cached_translation = None
+        held = manager.held_translations.get(websocket)
+        if held is not None:
+            if cache_key != held[0] or motion_level > manager.mode_manager.motion_level_threshold:
+                del manager.held_translations[websocket]
+            else:
+                cached_translation = held[1]
         
         # Process translation based on mode
-        translation_result = await manager.translation_engine.process_unified_stream(
-            mode=current_mode,
-            audio_data=base64.b64decode(audio_data) if audio_data else None,
-            gesture_data=hand_data.get("gesture") if hand_data else None
-        )
+        if cached_translation is not None:
+            translation_result = dict(cached_translation)
+            i3d_result = ensemble_result = None
+        elif current_mode == TranslationMode.SPEECH_TO_SIGN:
+            # Sign models have nothing to contribute in speech mode
+            translation_result = await manager.translation_engine.process_unified_stream(
+                mode=current_mode,
+                audio_data=bytes(audio_bytes) if audio_bytes else None,
+                gesture_data=gesture
+            )
+            i3d_result = ensemble_result = None
+        else:
+            # Collect the I3D and ensemble results concurrently; their context
+            # and history updates are applied afterwards in a fixed order
+            translation_result, i3d_result, ensemble_result = await asyncio.gather(
+                manager.translation_engine.process_unified_stream(
+                    mode=current_mode,
+                    audio_data=bytes(audio_bytes) if audio_bytes else None,
+                    gesture_data=gesture
+                ),
+                manager.translation_engine.get_i3d_translation(record=False),
+                manager.translation_engine.get_ensemble_translation(record=False)
+            )
+            if i3d_result:
+                manager.translation_engine.record_translation("i3d", i3d_result)
+            if ensemble_result:
+                manager.translation_engine.record_translation("ensemble", ensemble_result)
+            # Only real translations are held; engine errors are retried next frame
+            if (cache_key and websocket in manager.active_connections
+                    and translation_result.get("output_text") and "error" not in translation_result):
+                manager.held_translations[websocket] = (cache_key, dict(translation_result))
         
-        # Check for I3D translation results (runs in parallel)
-        i3d_result = await manager.translation_engine.get_i3d_translation()
+        # Merge I3D translation results
         if i3d_result:
             # Merge I3D results with main translation
             if translation_result.get("type") == "no_translation":
@@ -286,8 +553,7 @@ async def process_unified_message(message: Dict) -> Dict:
                     "method": "i3d"
                 }
         
-        # Check for ensemble translation results
-        ensemble_result = await manager.translation_engine.get_ensemble_translation()
+        # Merge ensemble translation results
         if ensemble_result:
             # Ensemble takes priority if available
             if translation_result.get("type") == "no_translation":
@@ -307,26 +573,31 @@ async def process_unified_message(message: Dict) -> Dict:
                     translation_result["primary_prediction"] = "ensemble"
         
         # Combine all results
-        response.update({
-            "mode": current_mode.value,
-            "audio_level": audio_level,
-            "motion_level": motion_level,
-            "hand_data": hand_data,
-            "translation": translation_result,
-            "mode_info": manager.mode_manager.get_mode_info()
-        })
+        response["mode"] = current_mode.value
+        response["audio_level"] = audio_level
+        response["motion_level"] = motion_level
+        if hand_data:
+            # Landmarks go out as a packed float16 buffer instead of nested JSON lists
+            response["hand_data"] = dict(hand_data, landmarks=pack_landmarks(hand_data["landmarks"]),
+                                         landmarks_format="float16")
+        response["translation"] = translation_result
+        response["mode_info"] = manager.mode_manager.get_mode_info()
         
         # Record frame for replay if session is active
         if manager.replay_service.active_recording:
             manager.replay_service.add_frame({
-                "audio": audio_data,
-                "video": video_data,
+                # Recordings are exported as JSON, so keep binary audio as base64;
+                # raw video is deduplicated and encoded by the replay service
+                "audio": audio_data if audio_data or not audio_bytes else
+                    base64.b64encode(audio_bytes).decode(),
+                "video": video_data if video_bytes is None else video_bytes,
                 "mode": current_mode.value,
                 "translation": translation_result
             })
         
         # Measure total processing time
-        total_latency = manager.performance_optimizer.measure_latency(start_time, "translation_latency")
+        total_latency = (time.perf_counter_ns() - start_ns) / 1_000_000
+        manager.performance_optimizer.record_latency(total_latency, "translation_latency")
         
         # Add performance metrics to response
         response["performance"] = {
@@ -348,7 +619,7 @@ async def process_unified_message(message: Dict) -> Dict:
         return {
             "type": "error",
             "error": str(e),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
 
 @app.get("/stats")
@@ -2,12 +2,48 @@ from enum import Enum
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
 import asyncio
+import time
+import numpy as np
 
 class TranslationMode(Enum):
     SPEECH_TO_SIGN = "speech_to_sign"
     SIGN_TO_SPEECH = "sign_to_speech"
     AUTO_DETECT = "auto_detect"
 
+class RollingMean:
+    """Fixed-size ring buffer of samples with an O(1) running mean"""
+    
+    def __init__(self, size: int):
+        self.samples = np.zeros(size, dtype=np.float32)
+        self.total = 0.0
+        self.index = 0
+        self.count = 0
+    
+    def add(self, value: float):
+        """Add a sample, overwriting the oldest once the buffer is full"""
+        # Sum the stored (float32) value so evicting it later cancels exactly
+        value = float(np.float32(value))
+        self.total += value - float(self.samples[self.index])
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % len(self.samples)
+        self.count = min(self.count + 1, len(self.samples))
+    
+    @property
+    def full(self) -> bool:
+        return self.count == len(self.samples)
+    
+    def last(self) -> float:
+        return float(self.samples[self.index - 1]) if self.count else 0
+    
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+    
+    def clear(self):
+        self.samples.fill(0)
+        self.total = 0.0
+        self.index = 0
+        self.count = 0
+
 class ModeManager:
     def __init__(self):
         self.current_mode = TranslationMode.AUTO_DETECT
@@ -15,9 +51,10 @@ class ModeManager:
         self.motion_level_threshold = 0.2  # Minimum motion to trigger sign mode
         self.mode_switch_cooldown = 1.0  # Seconds before allowing mode switch
         self.last_mode_switch = datetime.now()
-        self.audio_levels = []  # Rolling buffer for audio levels
-        self.motion_levels = []  # Rolling buffer for motion levels
+        self.last_mode_switch_mono = time.monotonic()
         self.buffer_size = 10  # Number of samples to keep
+        self.audio_levels = RollingMean(self.buffer_size)  # Rolling buffer for audio levels
+        self.motion_levels = RollingMean(self.buffer_size)  # Rolling buffer for motion levels
         
     async def detect_active_mode(
         self, 
@@ -27,22 +64,15 @@ class ModeManager:
     ) -> TranslationMode:
         """Automatically detect which mode should be active based on input signals"""
         
-        # Add to rolling buffers
-        self.audio_levels.append(audio_level)
-        self.motion_levels.append(motion_level)
-        
-        # Keep buffer size limited
-        if len(self.audio_levels) > self.buffer_size:
-            self.audio_levels.pop(0)
-        if len(self.motion_levels) > self.buffer_size:
-            self.motion_levels.pop(0)
+        self.record_levels(audio_level, motion_level)
         
         # Calculate average levels
-        avg_audio = sum(self.audio_levels) / len(self.audio_levels) if self.audio_levels else 0
-        avg_motion = sum(self.motion_levels) / len(self.motion_levels) if self.motion_levels else 0
+        avg_audio = self.audio_levels.mean()
+        avg_motion = self.motion_levels.mean()
         
         # Check if we're in cooldown period
-        time_since_switch = (datetime.now() - self.last_mode_switch).total_seconds()
+        now = datetime.now()
+        time_since_switch = (now - self.last_mode_switch).total_seconds()
         if time_since_switch < self.mode_switch_cooldown:
             return self.current_mode
         
@@ -69,26 +99,38 @@ class ModeManager:
         # Update mode if changed
         if detected_mode != self.current_mode:
             self.current_mode = detected_mode
-            self.last_mode_switch = datetime.now()
+            self.last_mode_switch = now
+            self.last_mode_switch_mono = time.monotonic()
             
         return detected_mode
     
+    def record_levels(self, audio_level: float, motion_level: float):
+        """Add a sample to the rolling buffers"""
+        self.audio_levels.add(audio_level)
+        self.motion_levels.add(motion_level)
+    
+    def can_skip_detection(self) -> bool:
+        """True while the mode is guaranteed not to change (cooldown, warm buffers)"""
+        return (time.monotonic() - self.last_mode_switch_mono < self.mode_switch_cooldown
+                and self.audio_levels.full and self.motion_levels.full)
+    
     def set_mode(self, mode: TranslationMode):
         """Manually set the translation mode"""
         self.current_mode = mode
         self.last_mode_switch = datetime.now()
+        self.last_mode_switch_mono = time.monotonic()
         # Clear buffers when manually switching
-        self.audio_levels = []
-        self.motion_levels = []
+        self.audio_levels.clear()
+        self.motion_levels.clear()
     
     def get_mode_info(self) -> Dict[str, Any]:
         """Get current mode information"""
         return {
             "current_mode": self.current_mode.value,
-            "audio_level": self.audio_levels[-1] if self.audio_levels else 0,
-            "motion_level": self.motion_levels[-1] if self.motion_levels else 0,
-            "avg_audio_level": sum(self.audio_levels) / len(self.audio_levels) if self.audio_levels else 0,
-            "avg_motion_level": sum(self.motion_levels) / len(self.motion_levels) if self.motion_levels else 0,
+            "audio_level": self.audio_levels.last(),
+            "motion_level": self.motion_levels.last(),
+            "avg_audio_level": self.audio_levels.mean(),
+            "avg_motion_level": self.motion_levels.mean(),
             "time_in_mode": (datetime.now() - self.last_mode_switch).total_seconds()
         }
     
@@ -96,5 +138,6 @@ class ModeManager:
         """Reset the mode manager to initial state"""
         self.current_mode = TranslationMode.AUTO_DETECT
         self.last_mode_switch = datetime.now()
-        self.audio_levels = []
-        self.motion_levels = []
\ No newline at end of file
+        self.last_mode_switch_mono = time.monotonic()
+        self.audio_levels.clear()
+        self.motion_levels.clear()
\ No newline at end of file
@@ -1,29 +1,86 @@
 import asyncio
 import time
 from typing import Dict, List, Optional, Callable
-from collections import deque
+from collections import OrderedDict, deque
 import numpy as np
 import cv2
-from functools import lru_cache
 import logging
 
+# Try to import scipy for anti-aliased audio decimation
+try:
+    from scipy.signal import firwin, resample_poly
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+class LatencyWindow:
+    """Last N samples with running sum/min/max; sorted copy built only for p95"""
+    
+    def __init__(self, maxlen: int = 100):
+        self.values = deque(maxlen=maxlen)
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self._extremes_stale = False
+        self._sorted: Optional[List[float]] = None
+    
+    def append(self, value: float):
+        """Add a sample, evicting the oldest once full"""
+        if len(self.values) == self.values.maxlen:
+            old = self.values[0]
+            self.total -= old
+            if old <= self.min or old >= self.max:
+                self._extremes_stale = True
+        self.values.append(value)
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self._sorted = None
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def mean(self) -> float:
+        """Average of the current samples"""
+        return self.total / len(self.values)
+    
+    def summary(self) -> Dict[str, float]:
+        """avg / min / max / p95 (linear interpolation, as np.percentile)"""
+        if self._extremes_stale:
+            self.min = min(self.values)
+            self.max = max(self.values)
+            self._extremes_stale = False
+        if self._sorted is None:
+            self._sorted = sorted(self.values)
+        
+        rank = 0.95 * (len(self._sorted) - 1)
+        lower = int(rank)
+        upper = min(lower + 1, len(self._sorted) - 1)
+        p95 = self._sorted[lower] + (self._sorted[upper] - self._sorted[lower]) * (rank - lower)
+        return {
+            "avg": self.mean(),
+            "min": self.min,
+            "max": self.max,
+            "p95": p95
+        }
+
 class PerformanceOptimizer:
     """Service for optimizing real-time streaming performance"""
     
     def __init__(self):
         self.metrics = {
-            "audio_latency": deque(maxlen=100),
-            "video_latency": deque(maxlen=100),
-            "translation_latency": deque(maxlen=100),
-            "frame_rate": deque(maxlen=100),
-            "audio_processing_time": deque(maxlen=100),
-            "video_processing_time": deque(maxlen=100)
+            "audio_latency": LatencyWindow(100),
+            "video_latency": LatencyWindow(100),
+            "translation_latency": LatencyWindow(100),
+            "frame_rate": LatencyWindow(100),
+            "audio_processing_time": LatencyWindow(100),
+            "video_processing_time": LatencyWindow(100)
         }
         self.frame_skip_threshold = 30  # Skip frames if FPS > 30
         self.audio_buffer_size = 2048  # Optimal buffer size
-        self.last_frame_time = time.time()
+        self._last_frame_ns = time.perf_counter_ns()
         self.frame_count = 0
         self.optimization_settings = {
             "enable_frame_skipping": True,
@@ -35,13 +92,33 @@ class PerformanceOptimizer:
             "i3d_buffer_size": 128,
             "i3d_sequence_length": 64,
             "i3d_stride": 16,
-            "enable_i3d": True
+            "enable_i3d": True,
+            "ws_coalesce_window": 0.010,  # Seconds to keep collecting a backlog
+            "ws_max_batch_bytes": 65536
         }
-        self._cache = {}
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+        # Hot-path copies of settings; change resolution via set_max_resolution
+        self._jpeg_params = [int(cv2.IMWRITE_JPEG_QUALITY), 70]
+        self._max_w, self._max_h = self.optimization_settings["max_resolution"]
+        self._frame_period_ns = 1_000_000_000 // self.optimization_settings["target_fps"]
+        # auto_adjust_quality state: resolution ceiling and hysteresis counters
+        self._base_resolution = self.optimization_settings["max_resolution"]
+        self._high_latency_calls = 0
+        self._low_latency_calls = 0
+        self._last_quality_adjust = float("-inf")
+        # Scratch buffers reused by optimize_audio_chunk (grown on demand)
+        self._audio_f32 = np.empty(self.audio_buffer_size * 4, dtype=np.float32)
+        self._audio_i16 = np.empty(self.audio_buffer_size * 4, dtype=np.int16)
+        # Half-band low-pass for 2:1 decimation, designed once
+        self._decimation_fir = firwin(33, 0.5, window=('kaiser', 5.0)) if SCIPY_AVAILABLE else None
         
     def measure_latency(self, start_time: float, metric_name: str) -> float:
-        """Measure and record latency for a specific operation"""
-        latency = (time.time() - start_time) * 1000  # Convert to ms
+        """Measure and record latency since a time.perf_counter() start"""
+        latency = (time.perf_counter() - start_time) * 1000  # Convert to ms
+        return self.record_latency(latency, metric_name)
+    
+    def record_latency(self, latency: float, metric_name: str) -> float:
+        """Record an already measured latency in ms"""
         if metric_name in self.metrics:
             self.metrics[metric_name].append(latency)
         return latency
@@ -51,155 +128,218 @@ class PerformanceOptimizer:
         if not self.optimization_settings["enable_frame_skipping"]:
             return False
             
-        current_time = time.time()
-        time_since_last_frame = current_time - self.last_frame_time
-        current_fps = 1.0 / time_since_last_frame if time_since_last_frame > 0 else 0
-        
-        # Skip frame if FPS is too high
-        if current_fps > self.optimization_settings["target_fps"]:
+        # Skip frame if it arrives sooner than the target frame period
+        now = time.perf_counter_ns()
+        if now - self._last_frame_ns < self._frame_period_ns:
             return True
             
-        self.last_frame_time = current_time
+        self._last_frame_ns = now
         return False
     
+    def set_target_fps(self, fps: int) -> None:
+        """Change the frame rate should_skip_frame lets through"""
+        self.optimization_settings["target_fps"] = fps
+        self._frame_period_ns = 1_000_000_000 // fps
+    
     def optimize_video_frame(self, frame: np.ndarray) -> np.ndarray:
-        """Optimize video frame for streaming"""
-        start_time = time.time()
-        
-        # Resize if needed
-        max_width, max_height = self.optimization_settings["max_resolution"]
+        """Scale a video frame down to the current max resolution"""
+        start_time = time.perf_counter()
+        frame = self._resize_frame(frame)
+        self.measure_latency(start_time, "video_processing_time")
+        return frame
+    
+    def optimize_video_frame_for_stream(self, frame: np.ndarray) -> bytes:
+        """Scale a video frame and encode it as lower quality JPEG for streaming"""
+        start_time = time.perf_counter()
+        frame = self._resize_frame(frame)
+        _, buffer = cv2.imencode('.jpg', frame, self._jpeg_params)
+        self.measure_latency(start_time, "video_processing_time")
+        return buffer.tobytes()
+    
+    def set_max_resolution(self, width: int, height: int) -> None:
+        """Change the frame size limit used by the video optimizers"""
+        self.optimization_settings["max_resolution"] = (width, height)
+        self._max_w, self._max_h = width, height
+    
+    def _resize_frame(self, frame: np.ndarray) -> np.ndarray:
+        """Resize if needed, using the cheapest filter that suits the scale"""
         height, width = frame.shape[:2]
         
-        if width > max_width or height > max_height:
-            scale = min(max_width / width, max_height / height)
-            new_width = int(width * scale)
-            new_height = int(height * scale)
-            frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_AREA)
-        
-        # Convert to lower quality JPEG for streaming
-        encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 70]
-        _, buffer = cv2.imencode('.jpg', frame, encode_param)
-        frame = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+        scale = min(self._max_w / width, self._max_h / height)
+        if scale >= 1.0:
+            # Already within max_resolution
+            return frame
         
-        self.measure_latency(start_time, "video_processing_time")
-        return frame
+        new_width = int(width * scale)
+        new_height = int(height * scale)
+        if scale <= 0.5:
+            # Large reductions: subsample by the integer factor first so the
+            # area filter only handles the remainder
+            step = int(1 / scale)
+            frame = frame[::step, ::step]
+            if frame.shape[1] == new_width and frame.shape[0] == new_height:
+                return np.ascontiguousarray(frame)
+            return cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_AREA)
+        return cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
     
     def optimize_audio_chunk(self, audio_data: bytes) -> bytes:
-        """Optimize audio chunk for streaming"""
-        start_time = time.time()
-        
-        if not self.optimization_settings["enable_audio_compression"]:
-            return audio_data
+        """Optimize float32 audio chunk for streaming; always returns 16-bit PCM"""
+        start_time = time.perf_counter()
         
         # Convert to numpy array
-        audio_array = np.frombuffer(audio_data, dtype=np.float32)
+        samples = np.frombuffer(audio_data, dtype=np.float32)
         
-        # Apply simple compression by reducing bit depth
-        audio_array = (audio_array * 32767).astype(np.int16)
-        audio_array = audio_array.astype(np.float32) / 32767
+        # Downsample if needed (only when compression is enabled; the int16
+        # conversion below always happens so callers see one format)
+        if (self.optimization_settings["enable_audio_compression"]
+                and len(samples) > self.audio_buffer_size * 2):
+            if SCIPY_AVAILABLE:
+                # Polyphase low-pass + decimate, so high frequencies don't alias
+                samples = resample_poly(samples, 1, 2, window=self._decimation_fir)
+            else:
+                # Simple downsampling by taking every other sample
+                samples = samples[::2]
         
-        # Downsample if needed
-        current_length = len(audio_array)
-        if current_length > self.audio_buffer_size * 2:
-            # Simple downsampling by taking every other sample
-            audio_array = audio_array[::2]
+        n = len(samples)
+        if n > len(self._audio_f32):
+            self._audio_f32 = np.empty(n, dtype=np.float32)
+            self._audio_i16 = np.empty(n, dtype=np.int16)
+        
+        # Apply simple compression by reducing bit depth, in place; the int16
+        # samples are the compressed format, so they aren't expanded back
+        scaled = self._audio_f32[:n]
+        np.multiply(samples, 32767.0, out=scaled)
+        np.rint(scaled, out=scaled)
+        np.clip(scaled, -32768, 32767, out=scaled)
+        audio_array = self._audio_i16[:n]
+        np.copyto(audio_array, scaled, casting='unsafe')
         
         optimized_data = audio_array.tobytes()
         self.measure_latency(start_time, "audio_processing_time")
         return optimized_data
     
-    @lru_cache(maxsize=128)
     def get_cached_gesture(self, gesture_key: str) -> Optional[Dict]:
         """Get cached gesture data to avoid reprocessing"""
-        return self._cache.get(gesture_key)
+        data = self._cache.get(gesture_key)
+        if data is not None:
+            self._cache.move_to_end(gesture_key)
+        return data
     
     def cache_gesture(self, gesture_key: str, data: Dict) -> None:
         """Cache gesture data for reuse"""
         if self.optimization_settings["enable_caching"]:
             self._cache[gesture_key] = data
-            # Limit cache size
-            if len(self._cache) > 100:
-                # Remove oldest entries
-                oldest_keys = list(self._cache.keys())[:20]
-                for key in oldest_keys:
-                    del self._cache[key]
+            self._cache.move_to_end(gesture_key)
+            # Limit cache size, evicting least recently used
+            while len(self._cache) > 100:
+                self._cache.popitem(last=False)
     
     async def optimize_websocket_message(self, message: Dict) -> Dict:
         """Optimize WebSocket message size"""
-        optimized = {}
+        # Only include non-null fields; payloads are never truncated
+        return {key: value for key, value in message.items() if value is not None}
+    
+    async def next_outbound_batch(self, queue: asyncio.Queue, encode: Callable[[Dict], str]) -> List[str]:
+        """
+        Wait for the next outbound message and coalesce any backlog behind it
         
-        # Only include non-null fields
-        for key, value in message.items():
-            if value is not None:
-                if key == "audio" and isinstance(value, str):
-                    # Truncate audio data if too large
-                    if len(value) > 50000:  # ~50KB limit
-                        optimized[key] = value[:50000]
-                    else:
-                        optimized[key] = value
-                elif key == "video" and isinstance(value, str):
-                    # Video already optimized by optimize_video_frame
-                    optimized[key] = value
-                else:
-                    optimized[key] = value
+        A message with nothing queued behind it is returned alone right away.
+        Otherwise messages keep being collected for up to ws_coalesce_window
+        seconds, or until ws_max_batch_bytes of encoded JSON. Each message is
+        encoded exactly once.
+        """
+        parts = [encode(await queue.get())]
+        if queue.empty():
+            return parts
         
-        return optimized
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.optimization_settings["ws_coalesce_window"]
+        size = len(parts[0])
+        while size < self.optimization_settings["ws_max_batch_bytes"]:
+            try:
+                message = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    message = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            parts.append(encode(message))
+            size += len(parts[-1])
+        return parts
     
     def get_performance_stats(self) -> Dict:
         """Get current performance statistics"""
         stats = {}
         
-        for metric_name, values in self.metrics.items():
-            if values:
-                stats[metric_name] = {
-                    "avg": np.mean(values),
-                    "min": np.min(values),
-                    "max": np.max(values),
-                    "p95": np.percentile(values, 95)
-                }
+        for metric_name, window in self.metrics.items():
+            if window:
+                stats[metric_name] = window.summary()
         
         # Calculate current FPS
         if self.frame_count > 0:
-            elapsed_time = time.time() - self.last_frame_time
+            elapsed_time = (time.perf_counter_ns() - self._last_frame_ns) / 1e9
             stats["current_fps"] = self.frame_count / elapsed_time if elapsed_time > 0 else 0
         
         return stats
     
     def auto_adjust_quality(self) -> None:
-        """Automatically adjust quality settings based on performance"""
-        stats = self.get_performance_stats()
+        """
+        Automatically adjust quality settings based on performance.
+        Resolution moves only after latency has stayed outside the
+        60-120 ms band for several calls, and at most once a second.
+        """
+        now = time.monotonic()
+        if now - self._last_quality_adjust < 1.0:
+            return
+        
+        video = self.metrics["video_latency"]
+        audio = self.metrics["audio_latency"]
+        avg_video_latency = video.mean() if video else 0
+        avg_audio_latency = audio.mean() if audio else 0
         
-        # Check if we need to reduce quality
-        avg_video_latency = stats.get("video_latency", {}).get("avg", 0)
-        avg_audio_latency = stats.get("audio_latency", {}).get("avg", 0)
+        # Count consecutive calls on either side of the band
+        if avg_video_latency > 120:
+            self._high_latency_calls += 1
+            self._low_latency_calls = 0
+        elif avg_video_latency < 60:
+            self._low_latency_calls += 1
+            self._high_latency_calls = 0
+        else:
+            self._high_latency_calls = self._low_latency_calls = 0
         
-        if avg_video_latency > 100:  # More than 100ms latency
+        max_width, max_height = self._base_resolution
+        if self._high_latency_calls >= 5 and (self._max_w, self._max_h) != (320, 240):
             # Reduce video quality
-            current_res = self.optimization_settings["max_resolution"]
-            new_width = int(current_res[0] * 0.8)
-            new_height = int(current_res[1] * 0.8)
-            self.optimization_settings["max_resolution"] = (max(320, new_width), max(240, new_height))
+            self.set_max_resolution(max(320, int(self._max_w * 0.8)), max(240, int(self._max_h * 0.8)))
+            self._high_latency_calls = 0
+            self._last_quality_adjust = now
             logger.info(f"Reduced video resolution to {self.optimization_settings['max_resolution']}")
+        elif self._low_latency_calls >= 5 and (self._max_w, self._max_h) != (max_width, max_height):
+            # Recover video quality
+            self.set_max_resolution(min(max_width, int(self._max_w * 1.25)), min(max_height, int(self._max_h * 1.25)))
+            self._low_latency_calls = 0
+            self._last_quality_adjust = now
+            logger.info(f"Raised video resolution to {self.optimization_settings['max_resolution']}")
         
         if avg_audio_latency > 50:  # More than 50ms latency
             # Reduce audio quality
             self.optimization_settings["audio_sample_rate"] = max(8000, self.optimization_settings["audio_sample_rate"] - 2000)
+            self._last_quality_adjust = now
             logger.info(f"Reduced audio sample rate to {self.optimization_settings['audio_sample_rate']}")
     
-    async def optimize_batch_processing(self, items: List[Dict], processor: Callable) -> List[Dict]:
-        """Process items in optimized batches"""
-        batch_size = 5  # Process 5 items at a time
-        results = []
+    async def optimize_batch_processing(self, items: List[Dict], processor: Callable,
+                                        max_concurrency: int = 5) -> List[Dict]:
+        """Process items concurrently, at most max_concurrency in flight, results in input order"""
+        semaphore = asyncio.Semaphore(max_concurrency)
         
-        for i in range(0, len(items), batch_size):
-            batch = items[i:i + batch_size]
-            batch_results = await asyncio.gather(*[processor(item) for item in batch])
-            results.extend(batch_results)
-            
-            # Small delay to prevent overwhelming the system
-            await asyncio.sleep(0.01)
+        async def run(item: Dict):
+            async with semaphore:
+                return await processor(item)
         
-        return results
+        return list(await asyncio.gather(*(run(item) for item in items)))
     
     def get_optimization_recommendations(self) -> List[str]:
         """Get recommendations for improving performance"""
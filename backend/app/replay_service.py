@@ -1,10 +1,19 @@
 import asyncio
-import json
+import orjson
 import base64
+import hashlib
+import heapq
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, AsyncGenerator
 from collections import deque
 import os
+import time
+
+# Recorded translations may carry numpy scalars / int keys straight from the pipeline
+_EXPORT_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Per-frame fields, stored column-wise (one list per field) in a recording
+FRAME_FIELDS = ("timestamp", "audio_data", "video_data", "mode", "translation")
 
 class ReplayService:
     """Service for recording and replaying translation sessions"""
@@ -13,14 +22,24 @@ class ReplayService:
         self.max_history = max_history
         self.translation_history: deque = deque(maxlen=max_history)
         self.active_recording = None
-        self.replay_cache = {}
+        # session_id -> session for everything in translation_history
+        self.replay_cache: Dict[str, Dict] = {}
     
     def start_recording(self, session_id: str) -> Dict:
         """Start recording a new translation session"""
+        start = datetime.now()
         self.active_recording = {
             "session_id": session_id,
-            "start_time": datetime.now().isoformat(),
-            "frames": [],
+            "start_time": start.isoformat(),
+            # Frames are stamped with perf_counter_ns offsets from here and
+            # formatted as wall-clock ISO strings only when read back
+            "start_wall": start.timestamp(),
+            "start_ns": time.perf_counter_ns(),
+            "frames": {field: [] for field in FRAME_FIELDS},
+            "frame_count": 0,
+            # blake2b digest -> video data URL; frames hold the digest so a
+            # static scene stores its image once
+            "video_blobs": {},
             "translations": [],
             "mode_sequence": []
         }
@@ -34,20 +53,19 @@ class ReplayService:
         if not self.active_recording:
             return
         
-        frame_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "audio_data": frame_data.get("audio"),
-            "video_data": frame_data.get("video"),
-            "mode": frame_data.get("mode"),
-            "translation": frame_data.get("translation")
-        }
-        
-        self.active_recording["frames"].append(frame_entry)
+        timestamp = time.perf_counter_ns()
+        frames = self.active_recording["frames"]
+        frames["timestamp"].append(timestamp)
+        frames["audio_data"].append(frame_data.get("audio"))
+        frames["video_data"].append(self._store_video(frame_data.get("video")))
+        frames["mode"].append(frame_data.get("mode"))
+        frames["translation"].append(frame_data.get("translation"))
+        self.active_recording["frame_count"] += 1
         
         # Add translation if present
         if frame_data.get("translation"):
             self.active_recording["translations"].append({
-                "timestamp": frame_entry["timestamp"],
+                "timestamp": timestamp,
                 "data": frame_data["translation"]
             })
         
@@ -57,21 +75,40 @@ class ReplayService:
                self.active_recording["mode_sequence"][-1]["mode"] != frame_data["mode"]:
                 self.active_recording["mode_sequence"].append({
                     "mode": frame_data["mode"],
-                    "timestamp": frame_entry["timestamp"]
+                    "timestamp": timestamp
                 })
     
+    def _store_video(self, video) -> Optional[bytes]:
+        """
+        Intern a frame's video in the recording's blob store.
+        Accepts a data URL string or raw JPEG bytes (base64-encoded only when new).
+        """
+        if not video:
+            return None
+        raw = video if isinstance(video, (bytes, bytearray, memoryview)) else video.encode()
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        blobs = self.active_recording["video_blobs"]
+        if digest not in blobs:
+            blobs[digest] = video if isinstance(video, str) else \
+                "data:image/jpeg;base64," + base64.b64encode(video).decode()
+        return digest
+    
     def stop_recording(self) -> Dict:
         """Stop recording and save to history"""
         if not self.active_recording:
             return {"status": "no_active_recording"}
         
         self.active_recording["end_time"] = datetime.now().isoformat()
-        self.active_recording["duration"] = len(self.active_recording["frames"]) * 0.1  # Assuming 10 FPS
+        self.active_recording["duration"] = self.active_recording["frame_count"] * 0.1  # Assuming 10 FPS
         
-        # Save to history
+        # Save to history; replay_cache indexes exactly the sessions in it
+        if len(self.translation_history) == self.max_history:
+            evicted = self.translation_history[0]
+            # A re-used id may already point at a newer recording
+            if self.replay_cache.get(evicted["session_id"]) is evicted:
+                del self.replay_cache[evicted["session_id"]]
         self.translation_history.append(self.active_recording)
         
-        # Cache for quick access
         session_id = self.active_recording["session_id"]
         self.replay_cache[session_id] = self.active_recording
         
@@ -87,14 +124,7 @@ class ReplayService:
     
     async def replay_session(self, session_id: str, speed: float = 1.0) -> AsyncGenerator:
         """Replay a recorded session"""
-        # Get session from cache or history
         session_data = self.replay_cache.get(session_id)
-        if not session_data:
-            # Search in history
-            for session in self.translation_history:
-                if session["session_id"] == session_id:
-                    session_data = session
-                    break
         
         if not session_data:
             raise ValueError(f"Session {session_id} not found")
@@ -102,24 +132,38 @@ class ReplayService:
         # Calculate frame delay based on speed
         frame_delay = 0.1 / speed  # 100ms per frame at normal speed
         
-        for i, frame in enumerate(session_data["frames"]):
+        total_frames = session_data["frame_count"]
+        # Sleep to absolute deadlines so per-frame overhead doesn't accumulate
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for i in range(total_frames):
             yield {
                 "type": "replay_frame",
                 "frame_number": i + 1,
-                "total_frames": len(session_data["frames"]),
-                "progress": (i + 1) / len(session_data["frames"]),
-                "data": frame
+                "total_frames": total_frames,
+                "progress": (i + 1) / total_frames,
+                "data": self._frame_at(session_data, i)
             }
-            await asyncio.sleep(frame_delay)
+            await asyncio.sleep(max(0.0, start + (i + 1) * frame_delay - loop.time()))
+    
+    @staticmethod
+    def _format_timestamp(session_data: Dict, timestamp_ns: int) -> str:
+        """Convert a perf_counter_ns stamp to an ISO wall-clock string"""
+        offset = (timestamp_ns - session_data["start_ns"]) / 1e9
+        return datetime.fromtimestamp(session_data["start_wall"] + offset).isoformat()
+    
+    def _frame_at(self, session_data: Dict, index: int) -> Dict:
+        """Assemble one frame dict from the column lists"""
+        frames = session_data["frames"]
+        frame = {field: frames[field][index] for field in FRAME_FIELDS}
+        frame["timestamp"] = self._format_timestamp(session_data, frame["timestamp"])
+        if frame["video_data"] is not None:
+            frame["video_data"] = session_data["video_blobs"][frame["video_data"]]
+        return frame
     
     def get_session_summary(self, session_id: str) -> Optional[Dict]:
         """Get summary of a recorded session"""
         session_data = self.replay_cache.get(session_id)
-        if not session_data:
-            for session in self.translation_history:
-                if session["session_id"] == session_id:
-                    session_data = session
-                    break
         
         if not session_data:
             return None
@@ -132,14 +176,14 @@ class ReplayService:
                     "type": "speech",
                     "text": translation["data"].get("input_text", ""),
                     "signs": translation["data"].get("signs", []),
-                    "timestamp": translation["timestamp"]
+                    "timestamp": self._format_timestamp(session_data, translation["timestamp"])
                 })
             elif translation["data"].get("type") == "sign_to_speech":
                 key_moments.append({
                     "type": "sign",
                     "gesture": translation["data"].get("gesture", ""),
                     "text": translation["data"].get("output_text", ""),
-                    "timestamp": translation["timestamp"]
+                    "timestamp": self._format_timestamp(session_data, translation["timestamp"])
                 })
         
         return {
@@ -166,57 +210,57 @@ class ReplayService:
     def export_session(self, session_id: str, format: str = "json") -> bytes:
         """Export session data in specified format"""
         session_data = self.replay_cache.get(session_id)
-        if not session_data:
-            for session in self.translation_history:
-                if session["session_id"] == session_id:
-                    session_data = session
-                    break
         
         if not session_data:
             raise ValueError(f"Session {session_id} not found")
         
         if format == "json":
-            return json.dumps(session_data, indent=2).encode()
+            # Export keeps the one-object-per-frame layout
+            exported = dict(session_data)
+            exported["frames"] = [self._frame_at(session_data, i)
+                                  for i in range(session_data["frame_count"])]
+            for key in ("translations", "mode_sequence"):
+                exported[key] = [
+                    dict(entry, timestamp=self._format_timestamp(session_data, entry["timestamp"]))
+                    for entry in session_data[key]
+                ]
+            for key in ("frame_count", "start_wall", "start_ns", "video_blobs"):
+                del exported[key]
+            return orjson.dumps(exported, option=_EXPORT_OPTIONS)
         elif format == "summary":
             summary = self.get_session_summary(session_id)
-            return json.dumps(summary, indent=2).encode()
+            return orjson.dumps(summary, option=_EXPORT_OPTIONS)
         else:
             raise ValueError(f"Unsupported format: {format}")
     
     def create_highlight_reel(self, session_id: str) -> Dict:
         """Create a highlight reel of key translations"""
         session_data = self.replay_cache.get(session_id)
-        if not session_data:
-            for session in self.translation_history:
-                if session["session_id"] == session_id:
-                    session_data = session
-                    break
         
         if not session_data:
             return {"error": "Session not found"}
         
+        # Top 10 high-confidence translations; only the winners get formatted
+        top = heapq.nlargest(
+            10,
+            (translation for translation in session_data["translations"]
+             if translation["data"].get("confidence", 0) > 0.9),
+            key=lambda translation: translation["data"]["confidence"]
+        )
         highlights = []
-        
-        # Extract interesting translations
-        for translation in session_data["translations"]:
+        for translation in top:
             trans_data = translation["data"]
-            
-            # High confidence translations
-            if trans_data.get("confidence", 0) > 0.9:
-                highlights.append({
-                    "timestamp": translation["timestamp"],
-                    "type": trans_data.get("type"),
-                    "content": trans_data.get("input_text") or trans_data.get("gesture"),
-                    "translation": trans_data.get("signs") or trans_data.get("output_text"),
-                    "confidence": trans_data.get("confidence")
-                })
-        
-        # Sort by confidence and take top 10
-        highlights.sort(key=lambda x: x.get("confidence", 0), reverse=True)
+            highlights.append({
+                "timestamp": self._format_timestamp(session_data, translation["timestamp"]),
+                "type": trans_data.get("type"),
+                "content": trans_data.get("input_text") or trans_data.get("gesture"),
+                "translation": trans_data.get("signs") or trans_data.get("output_text"),
+                "confidence": trans_data.get("confidence")
+            })
         
         return {
             "session_id": session_id,
             "duration": session_data["duration"],
-            "highlight_count": len(highlights[:10]),
-            "highlights": highlights[:10]
+            "highlight_count": len(highlights),
+            "highlights": highlights
         }
\ No newline at end of file
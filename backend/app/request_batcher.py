@@ -0,0 +1,106 @@
+"""
+Request batcher
+Coalesces requests (provider prompts, model inputs) that arrive within a
+short window into one upstream call and hands each caller its own slice of
+the response
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class RequestBatcher:
+    """Asynchronous micro-batcher for provider calls and model inference"""
+
+    def __init__(self,
+                 send_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch_size: int = 8,
+                 max_wait: float = 0.01):
+        """
+        Initialize batcher
+
+        Args:
+            send_batch: Coroutine sending a list of prompts, returning one reply per prompt
+            max_batch_size: Maximum prompts per upstream call
+            max_wait: Seconds to wait for more prompts after the first arrives
+        """
+        self.send_batch = send_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        # In-flight dispatches; the loop only keeps weak references to tasks
+        self._dispatches: Set[asyncio.Task] = set()
+
+    async def submit(self, prompt: Any) -> Any:
+        """Queue a prompt and wait for its reply"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((prompt, future))
+        return await future
+
+    async def close(self):
+        """Stop the background worker and cancel in-flight and queued requests"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        dispatches = list(self._dispatches)
+        for task in dispatches:
+            task.cancel()
+        await asyncio.gather(*dispatches, return_exceptions=True)
+
+        while not self.queue.empty():
+            _, future = self.queue.get_nowait()
+            future.cancel()
+
+    async def _run(self):
+        """Collect prompts into batches and dispatch them"""
+        while True:
+            batch = [await self.queue.get()]
+            await asyncio.sleep(self.max_wait)
+
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            # Dispatch without waiting so the next window can fill meanwhile
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """Send one batch upstream and resolve its futures"""
+        prompts = [prompt for prompt, _ in batch]
+        try:
+            replies = await self.send_batch(prompts)
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"Batched request failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for i, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if i < len(replies):
+                future.set_result(replies[i])
+            else:
+                future.set_exception(ValueError(f"Missing reply for batched prompt {i}"))
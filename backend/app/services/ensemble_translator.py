@@ -8,20 +8,67 @@ import numpy as np
 from typing import List, Dict, Optional, Tuple, Any
 import logging
 import time
-from collections import deque
-import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from ..models.i3d import I3DProcessor, VocabularyManager, TemporalBuffer
 from ..models.tgcn import PoseProcessor
+from ..request_batcher import RequestBatcher
+from ..utils.circular_buffer import CircularTensorBuffer
 from ..utils.logger import setup_logger
 from ..utils.video_augmentation import PoseAwareAugmentation
 
+# Try to import torch to fuse model outputs that are still on the device
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+# Try to import numba to JIT-compile the adaptive-weight reduction
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernel runs as plain Python"""
+        def decorator(func):
+            return func
+        return decorator
+
 logger = setup_logger(__name__)
 
 
+def _to_host(probabilities) -> np.ndarray:
+    """NumPy view of a probability vector that may be a (device) tensor"""
+    if TORCH_AVAILABLE and isinstance(probabilities, torch.Tensor):
+        return probabilities.detach().cpu().numpy()
+    return np.asarray(probabilities)
+
+
+@njit(cache=True)
+def _mean_confidences(confs, filled):
+    """Per-column mean of the positive confidences in the first filled rows (0.5 if none)"""
+    means = np.full(confs.shape[1], 0.5)
+    for j in range(confs.shape[1]):
+        total = 0.0
+        count = 0
+        for i in range(filled):
+            c = confs[i, j]
+            if c > 0:
+                total += c
+                count += 1
+        if count > 0:
+            means[j] = total / count
+    return means
+
+
 class EnsembleTranslator:
     """Ensemble service combining I3D and TGCN models"""
     
+    CACHED_MODELS = ('i3d', 'tgcn')
+    
     def __init__(self,
                  vocab_size: int = 100,
                  i3d_weights_path: Optional[str] = None,
@@ -61,6 +108,7 @@ class EnsembleTranslator:
             'i3d': 0.6,  # Appearance features
             'tgcn': 0.4  # Pose features
         }
+        self._refresh_model_weights()
         
         # Temporal buffers for both models
         self.i3d_buffer = TemporalBuffer(
@@ -70,28 +118,44 @@ class EnsembleTranslator:
             fps_target=25
         )
         
-        self.pose_buffer = TemporalBuffer(
-            buffer_size=64,
+        # Keypoints go straight into a preallocated float32 ring, so TGCN
+        # gets a contiguous (sequence_length, keypoints, C) view
+        self.pose_buffer = CircularTensorBuffer(
+            capacity=64,
             sequence_length=30,
-            stride=10,
             fps_target=15  # Lower FPS for pose
         )
         
         # Augmentation
         self.augmentation = PoseAwareAugmentation()
         
-        # Results cache with thread safety
-        self.results_cache = deque(maxlen=10)
-        self.cache_lock = threading.Lock()
+        # One inference thread per model, so I3D and TGCN really overlap
+        # instead of taking turns on the event loop
+        self._i3d_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='i3d')
+        self._tgcn_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tgcn')
+        
+        # Per-model micro-batchers: sequences submitted within a few ms (e.g.
+        # by concurrent sessions) share one inference call on the model's
+        # thread. Only for processors with a batch API; otherwise batching
+        # would just add the wait window to per-sequence calls
+        self.i3d_batcher = self._make_batcher(self._i3d_pool, self.i3d_processor)
+        self.tgcn_batcher = self._make_batcher(self._tgcn_pool, self.pose_processor)
+        
+        # Per-model confidences of the last 10 ensemble results (ring buffer,
+        # columns in CACHED_MODELS order); only touched from the event loop
+        self._cache_confs = np.zeros((10, len(self.CACHED_MODELS)), dtype=np.float32)
+        self._cache_count = 0
         
         # Statistics
         self.stats = {
-            'ensemble_predictions': 0,
             'i3d_only': 0,
-            'tgcn_only': 0,
-            'agreement_rate': 0.0,
-            'average_confidence': 0.0
+            'tgcn_only': 0
         }
+        # Per-ensemble accumulators are plain attributes; the count and
+        # rates/averages are folded into the stats dict in get_stats
+        self._ensemble_count = 0
+        self._agree_sum = 0
+        self._conf_sum = 0.0
         
         logger.info(f"Ensemble translator initialized with weights: {self.ensemble_weights}")
     
@@ -111,8 +175,7 @@ class EnsembleTranslator:
         # Extract pose and add to TGCN buffer
         pose_data = self.pose_processor.process_single_frame(frame)
         if pose_data['confidence'] > 0.5:  # Only add good poses
-            pose_frame = pose_data['keypoints']
-            self.pose_buffer.add_frame(pose_frame)
+            self.pose_buffer.add_frame(pose_data['keypoints'])
         
         return i3d_added
     
@@ -148,22 +211,42 @@ class EnsembleTranslator:
         # Combine predictions
         return self._ensemble_predictions(predictions)
     
+    def _make_batcher(self, pool: ThreadPoolExecutor, processor) -> Optional[RequestBatcher]:
+        """Micro-batcher for a processor with inference_batch, else None"""
+        if not hasattr(processor, 'inference_batch'):
+            return None
+        return RequestBatcher(
+            lambda sequences: self._run_batch(pool, processor, sequences),
+            max_batch_size=16
+        )
+    
+    async def _run_batch(self, pool: ThreadPoolExecutor, processor, sequences: List[Any]) -> List[Dict[str, Any]]:
+        """Batcher callback: one batched inference on the model's own thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, processor.inference_batch, sequences)
+    
+    async def _infer(self, batcher: Optional[RequestBatcher], pool: ThreadPoolExecutor,
+                     processor, sequence: Any) -> Dict[str, Any]:
+        """Infer one sequence, through the batcher if the model has one"""
+        if batcher is not None:
+            return await batcher.submit(sequence)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, processor.inference, sequence)
+    
     async def _get_i3d_prediction(self, frames: List[np.ndarray]) -> Dict[str, Any]:
         """Get I3D prediction"""
         try:
-            result = self.i3d_processor.inference(frames)
+            result = dict(await self._infer(self.i3d_batcher, self._i3d_pool, self.i3d_processor, frames))
             result['model'] = 'i3d'
             return result
         except Exception as e:
             logger.error(f"I3D prediction error: {e}")
             return {'success': False, 'model': 'i3d', 'error': str(e)}
     
-    async def _get_tgcn_prediction(self, pose_sequence: List[np.ndarray]) -> Dict[str, Any]:
+    async def _get_tgcn_prediction(self, pose_sequence: np.ndarray) -> Dict[str, Any]:
         """Get TGCN prediction"""
         try:
-            # Convert list to numpy array
-            pose_array = np.array(pose_sequence)
-            result = self.pose_processor.inference(pose_array)
+            result = dict(await self._infer(self.tgcn_batcher, self._tgcn_pool, self.pose_processor, pose_sequence))
             result['model'] = 'tgcn'
             return result
         except Exception as e:
@@ -195,6 +278,8 @@ class EnsembleTranslator:
         # Single model fallback
         if len(valid_predictions) == 1:
             result = valid_predictions[0].copy()
+            if 'probabilities' in result:
+                result['probabilities'] = _to_host(result['probabilities'])
             result['method'] = 'ensemble_single'
             result['models_used'] = [valid_predictions[0]['model']]
             
@@ -203,43 +288,28 @@ class EnsembleTranslator:
             
             return result
         
-        # Ensemble combination
-        ensemble_probs = None
-        model_results = {}
+        # Ensemble combination: weighted mean of the model probabilities
+        ensemble_probs = self._fuse_probabilities(valid_predictions)
         
+        model_results = {}
         for pred in valid_predictions:
-            model = pred['model']
-            weight = self.ensemble_weights.get(model, 0.5)
-            probs = pred['probabilities']
-            
-            # Weight probabilities
-            weighted_probs = probs * weight
-            
-            if ensemble_probs is None:
-                ensemble_probs = weighted_probs
-            else:
-                ensemble_probs += weighted_probs
-            
             # Store individual results
-            model_results[model] = {
+            model_results[pred['model']] = {
                 'prediction': pred['prediction'],
                 'confidence': pred['confidence'],
                 'top_k': list(zip(pred.get('top_k_indices', []), 
                                 pred.get('top_k_confidences', [])))
             }
         
-        # Normalize ensemble probabilities
-        ensemble_probs = ensemble_probs / sum(self.ensemble_weights.values())
-        
-        # Get ensemble prediction
-        prediction_id = int(np.argmax(ensemble_probs))
-        confidence = float(ensemble_probs[prediction_id])
-        
-        # Get top-k
+        # Get top-k in one partition pass; the best of them is the prediction
         top_k = min(5, len(ensemble_probs))
-        top_indices = np.argsort(ensemble_probs)[-top_k:][::-1]
+        top_indices = np.argpartition(ensemble_probs, -top_k)[-top_k:]
+        top_indices = top_indices[np.argsort(ensemble_probs[top_indices])[::-1]]
         top_confidences = ensemble_probs[top_indices]
         
+        prediction_id = int(top_indices[0])
+        confidence = float(top_confidences[0])
+        
         # Get gloss and text
         gloss = self.vocabulary.id_to_gloss.get(prediction_id, 'unknown')
         text = self.vocabulary.get_gloss_text(gloss)
@@ -249,14 +319,9 @@ class EnsembleTranslator:
         agreement = len(set(model_predictions)) == 1
         
         # Update stats
-        self.stats['ensemble_predictions'] += 1
-        n = self.stats['ensemble_predictions']
-        self.stats['agreement_rate'] = (
-            (self.stats['agreement_rate'] * (n - 1) + (1 if agreement else 0)) / n
-        )
-        self.stats['average_confidence'] = (
-            (self.stats['average_confidence'] * (n - 1) + confidence) / n
-        )
+        self._ensemble_count += 1
+        self._agree_sum += agreement
+        self._conf_sum += confidence
         
         # Create result
         result = {
@@ -275,12 +340,38 @@ class EnsembleTranslator:
             'latency_ms': (time.time() - start_time) * 1000
         }
         
-        # Cache result with thread safety
-        with self.cache_lock:
-            self.results_cache.append(result)
+        # Record per-model confidences for adaptive weighting
+        self._cache_confs[self._cache_count % len(self._cache_confs)] = [
+            model_results[model]['confidence'] if model in model_results else 0.5
+            for model in self.CACHED_MODELS
+        ]
+        self._cache_count += 1
         
         return result
     
+    def _fuse_probabilities(self, valid_predictions: List[Dict[str, Any]]) -> np.ndarray:
+        """Weighted mean of the models' probabilities, as a host array"""
+        if tuple(p['model'] for p in valid_predictions) == self.CACHED_MODELS:
+            # Usual case: weights precomputed and already normalized
+            weights = self._model_weights
+        else:
+            weights = np.fromiter(
+                (self.ensemble_weights.get(p['model'], 0.5) for p in valid_predictions),
+                dtype=np.float32, count=len(valid_predictions)
+            )
+            weights = weights / weights.sum()
+        
+        probs = [p['probabilities'] for p in valid_predictions]
+        if (TORCH_AVAILABLE and all(isinstance(x, torch.Tensor) for x in probs)
+                and len({x.device for x in probs}) == 1):
+            # Processors that hand back device tensors: combine on the device
+            # and copy only the fused vector to the host
+            stack = torch.stack(probs)
+            device_weights = torch.as_tensor(weights, dtype=stack.dtype, device=stack.device)
+            return (device_weights @ stack).cpu().numpy()
+        
+        return weights @ np.stack([_to_host(x) for x in probs])
+    
     def update_ensemble_weights(self, weights: Dict[str, float]):
         """
         Update ensemble weights
@@ -291,8 +382,15 @@ class EnsembleTranslator:
         # Normalize weights
         total = sum(weights.values())
         self.ensemble_weights = {k: v/total for k, v in weights.items()}
+        self._refresh_model_weights()
         logger.info(f"Updated ensemble weights: {self.ensemble_weights}")
     
+    def _refresh_model_weights(self):
+        """Cache ensemble_weights as a normalized vector in CACHED_MODELS order"""
+        weights = np.array([self.ensemble_weights.get(model, 0.5) for model in self.CACHED_MODELS],
+                           dtype=np.float32)
+        self._model_weights = weights / weights.sum()
+    
     def get_adaptive_weights(self) -> Dict[str, float]:
         """
         Calculate adaptive weights based on recent performance
@@ -300,47 +398,42 @@ class EnsembleTranslator:
         Returns:
             Adaptive weights
         """
-        with self.cache_lock:
-            if len(self.results_cache) < 5:
-                return self.ensemble_weights
-            
-            # Analyze recent predictions
-            model_confidences = {'i3d': [], 'tgcn': []}
-            
-            for result in list(self.results_cache):  # Create a copy for thread safety
-                if 'model_results' in result:
-                    for model, data in result['model_results'].items():
-                        model_confidences[model].append(data['confidence'])
-        
-        # Calculate average confidences
-        adaptive_weights = {}
-        for model in ['i3d', 'tgcn']:
-            if model_confidences[model]:
-                avg_conf = np.mean(model_confidences[model])
-                adaptive_weights[model] = avg_conf
-            else:
-                adaptive_weights[model] = 0.5
+        filled = min(self._cache_count, len(self._cache_confs))
+        if filled < 5:
+            return self.ensemble_weights
+        
+        # Average confidence per model over the recent predictions
+        means = _mean_confidences(self._cache_confs, filled)
         
         # Normalize
-        total = sum(adaptive_weights.values())
+        total = means.sum()
         if total > 0:
-            adaptive_weights = {k: v/total for k, v in adaptive_weights.items()}
-        
-        return adaptive_weights
+            means = means / total
+        return {model: float(means[i]) for i, model in enumerate(self.CACHED_MODELS)}
     
     def get_stats(self) -> Dict[str, Any]:
         """Get ensemble statistics"""
         stats = self.stats.copy()
+        n = stats['ensemble_predictions'] = self._ensemble_count
+        stats['agreement_rate'] = self._agree_sum / n if n else 0.0
+        stats['average_confidence'] = self._conf_sum / n if n else 0.0
         stats['current_weights'] = self.ensemble_weights
         stats['adaptive_weights'] = self.get_adaptive_weights()
         stats['i3d_buffer_info'] = self.i3d_buffer.get_buffer_info()
         stats['pose_buffer_info'] = self.pose_buffer.get_buffer_info()
         return stats
     
+    async def close(self):
+        """Stop the batchers and inference threads"""
+        for batcher in (self.i3d_batcher, self.tgcn_batcher):
+            if batcher is not None:
+                await batcher.close()
+        self._i3d_pool.shutdown(wait=False)
+        self._tgcn_pool.shutdown(wait=False)
+    
     def clear_buffers(self):
         """Clear all buffers"""
         self.i3d_buffer.clear()
         self.pose_buffer.clear()
-        with self.cache_lock:
-            self.results_cache.clear()
+        self._cache_count = 0
         logger.info("Ensemble buffers cleared")
\ No newline at end of file
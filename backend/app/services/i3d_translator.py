@@ -8,8 +8,6 @@ import numpy as np
 from typing import List, Dict, Optional, Tuple, Any
 import logging
 import time
-from collections import deque
-import threading
 
 from ..models.i3d import I3DProcessor, VocabularyManager, TemporalBuffer
 from ..utils.logger import setup_logger
@@ -54,8 +52,7 @@ class I3DTranslatorService:
             on_sequence_ready=self._on_sequence_ready
         )
         
-        # Translation cache
-        self.translation_cache = deque(maxlen=10)
+        # Most recent translation, served for up to a second
         self.last_translation = None
         self.last_translation_time = 0
         
@@ -65,11 +62,13 @@ class I3DTranslatorService:
         
         # Statistics
         self.stats = {
-            'translations_completed': 0,
-            'average_confidence': 0.0,
-            'average_latency': 0.0,
             'cache_hits': 0
         }
+        # Per-translation accumulators are plain attributes; the count and
+        # averages are folded into the stats dict in get_stats
+        self._completed = 0
+        self._conf_sum = 0.0
+        self._lat_sum = 0.0
         
         logger.info(f"I3D Translator initialized with vocab_size={vocab_size}")
     
@@ -251,24 +250,19 @@ class I3DTranslatorService:
         """Cache translation result"""
         self.last_translation = result
         self.last_translation_time = time.time()
-        self.translation_cache.append(result)
     
     def _update_stats(self, confidence: float, latency: float):
         """Update service statistics"""
-        self.stats['translations_completed'] += 1
-        
-        # Update running averages
-        n = self.stats['translations_completed']
-        self.stats['average_confidence'] = (
-            (self.stats['average_confidence'] * (n - 1) + confidence) / n
-        )
-        self.stats['average_latency'] = (
-            (self.stats['average_latency'] * (n - 1) + latency) / n
-        )
+        self._completed += 1
+        self._conf_sum += confidence
+        self._lat_sum += latency
     
     def get_stats(self) -> Dict[str, Any]:
         """Get service statistics"""
         stats = self.stats.copy()
+        n = stats['translations_completed'] = self._completed
+        stats['average_confidence'] = self._conf_sum / n if n else 0.0
+        stats['average_latency'] = self._lat_sum / n if n else 0.0
         stats['buffer_info'] = self.temporal_buffer.get_buffer_info()
         stats['vocabulary_stats'] = self.vocabulary.get_vocabulary_stats()
         return stats
@@ -286,7 +280,6 @@ class I3DTranslatorService:
             self.vocabulary = VocabularyManager(vocab_size=vocab_size)
             
             # Clear caches
-            self.translation_cache.clear()
             self.last_translation = None
     
     def clear_buffer(self):
@@ -4,81 +4,84 @@ This provides basic functionality when the SLP library is not available.
 """
 
 import asyncio
-from typing import Dict, List, Optional, Any
+import functools
+import re
+import sys
+from typing import Dict, List, Optional, Any, Tuple
 import numpy as np
 import json
 
+# Basic sign mappings; keys are interned and signs stored as tuples since the
+# table is shared by every instance and never mutated
+_TEXT_TO_SIGNS = {
+    sys.intern(text): tuple(signs) for text, signs in {
+        "hello": ["HELLO"],
+        "hi": ["HELLO"],
+        "how are you": ["HOW", "YOU"],
+        "thank you": ["THANK-YOU"],
+        "thanks": ["THANK-YOU"],
+        "please": ["PLEASE"],
+        "sorry": ["SORRY"],
+        "yes": ["YES"],
+        "no": ["NO"],
+        "good": ["GOOD"],
+        "bad": ["BAD"],
+        "morning": ["MORNING"],
+        "night": ["NIGHT"],
+        "goodbye": ["GOODBYE"],
+        "bye": ["GOODBYE"],
+        "i love you": ["I-LOVE-YOU"],
+        "help": ["HELP"],
+        "what": ["WHAT"],
+        "where": ["WHERE"],
+        "when": ["WHEN"],
+        "who": ["WHO"],
+        "why": ["WHY"],
+        "how": ["HOW"],
+        "name": ["NAME"],
+        "my": ["MY"],
+        "your": ["YOUR"],
+        "nice to meet you": ["NICE", "MEET", "YOU"],
+    }.items()
+}
+
+# Dropped from sign output: ASL has no articles and usually omits "to be"
+_OMITTED_WORDS = frozenset(["a", "an", "the", "am", "is", "are", "was", "were"])
+
 class SimpleSignTranslator:
     """Fallback translator using rule-based approach"""
     
     def __init__(self):
         # Basic sign mappings
-        self.text_to_signs = {
-            "hello": ["HELLO"],
-            "hi": ["HELLO"],
-            "how are you": ["HOW", "YOU"],
-            "thank you": ["THANK-YOU"],
-            "thanks": ["THANK-YOU"],
-            "please": ["PLEASE"],
-            "sorry": ["SORRY"],
-            "yes": ["YES"],
-            "no": ["NO"],
-            "good": ["GOOD"],
-            "bad": ["BAD"],
-            "morning": ["MORNING"],
-            "night": ["NIGHT"],
-            "goodbye": ["GOODBYE"],
-            "bye": ["GOODBYE"],
-            "i love you": ["I-LOVE-YOU"],
-            "help": ["HELP"],
-            "what": ["WHAT"],
-            "where": ["WHERE"],
-            "when": ["WHEN"],
-            "who": ["WHO"],
-            "why": ["WHY"],
-            "how": ["HOW"],
-            "name": ["NAME"],
-            "my": ["MY"],
-            "your": ["YOUR"],
-            "nice to meet you": ["NICE", "MEET", "YOU"],
-        }
+        self.text_to_signs = _TEXT_TO_SIGNS
         
         # Common ASL grammar rules
         self.grammar_rules = {
-            "question_words": ["what", "where", "when", "who", "why", "how"],
-            "pronouns": ["i", "you", "he", "she", "it", "we", "they"],
-            "possessives": ["my", "your", "his", "her", "its", "our", "their"]
+            "question_words": frozenset(["what", "where", "when", "who", "why", "how"]),
+            "pronouns": frozenset(["i", "you", "he", "she", "it", "we", "they"]),
+            "possessives": frozenset(["my", "your", "his", "her", "its", "our", "their"])
         }
+        # Precompiled sign forms: spelled words map straight to their interned
+        # sign, and the grammar pass compares signs without lowercasing them
+        self._spelled_signs = {
+            word: sys.intern(word.upper())
+            for word in self.grammar_rules["question_words"] | self.grammar_rules["pronouns"]
+        }
+        self._question_signs = frozenset(self._spelled_signs[word] for word in self.grammar_rules["question_words"])
+        
+        # One pass over the text: known phrases (longest first, on word
+        # boundaries), otherwise single words
+        phrases = sorted(self.text_to_signs, key=len, reverse=True)
+        self._token_re = re.compile(r"\b(" + "|".join(map(re.escape, phrases)) + r")\b|[\w'-]+")
+        
+        # Translation is a pure function of the normalized text (context is
+        # unused), so repeated phrases are served from a per-instance LRU
+        self._translate_cached = functools.lru_cache(maxsize=1024)(self._translate)
         
     async def translate_text_to_signs(self, text: str, context: Optional[List[Dict]] = None) -> Dict[str, Any]:
         """Translate text to sign representation using rules"""
         try:
-            text_lower = text.lower().strip()
-            signs = []
-            
-            # Check for exact phrase matches first
-            if text_lower in self.text_to_signs:
-                signs = self.text_to_signs[text_lower]
-            else:
-                # Break into words and translate
-                words = text_lower.split()
-                
-                for word in words:
-                    if word in self.text_to_signs:
-                        signs.extend(self.text_to_signs[word])
-                    else:
-                        # Check if it's a question word
-                        if word in self.grammar_rules["question_words"]:
-                            signs.append(word.upper())
-                        # Check if it's a pronoun
-                        elif word in self.grammar_rules["pronouns"]:
-                            signs.append(word.upper())
-                        # For unknown words, fingerspell or use the word itself
-                        else:
-                            signs.append(f"[{word.upper()}]")
-            
-            # Apply basic ASL grammar rules
-            signs = self._apply_asl_grammar(signs, text_lower)
+            signs = list(self._translate_cached(text.lower().strip()))
             
             return {
                 "success": True,
@@ -99,22 +102,37 @@ class SimpleSignTranslator:
                 "gloss": ""
             }
     
-    def _apply_asl_grammar(self, signs: List[str], original_text: str) -> List[str]:
-        """Apply basic ASL grammar transformations"""
-        # ASL typically puts question words at the end
-        if any(word in original_text for word in self.grammar_rules["question_words"]):
-            # Move question words to the end
-            question_signs = [s for s in signs if s.lower() in self.grammar_rules["question_words"]]
-            other_signs = [s for s in signs if s.lower() not in self.grammar_rules["question_words"]]
-            signs = other_signs + question_signs
+    def _translate(self, text_lower: str) -> Tuple[str, ...]:
+        """Map normalized text to signs (cached by _translate_cached)"""
+        signs = []
         
-        # Remove articles (a, an, the) - ASL doesn't use them
-        signs = [s for s in signs if s.lower() not in ["a", "an", "the"]]
+        for match in self._token_re.finditer(text_lower):
+            phrase = match.group(1)
+            if phrase is not None:
+                signs.extend(self.text_to_signs[phrase])
+                continue
+            word = match.group(0)
+            # Remove articles and "to be" verbs before they get fingerspelled
+            if word in _OMITTED_WORDS:
+                continue
+            # Question words and pronouns sign as themselves
+            sign = self._spelled_signs.get(word)
+            # For unknown words, fingerspell or use the word itself
+            signs.append(sign if sign is not None else f"[{word.upper()}]")
         
-        # Remove "to be" verbs in many contexts
-        signs = [s for s in signs if s.lower() not in ["am", "is", "are", "was", "were"]]
-        
-        return signs
+        # Apply basic ASL grammar rules
+        return tuple(self._apply_asl_grammar(signs))
+    
+    def _apply_asl_grammar(self, signs: List[str]) -> List[str]:
+        """Apply basic ASL grammar transformations"""
+        question_set = self._question_signs
+        question_signs = []
+        other_signs = []
+        for s in signs:
+            # ASL typically puts question words at the end
+            (question_signs if s in question_set else other_signs).append(s)
+        other_signs.extend(question_signs)
+        return other_signs
     
     async def translate_landmarks_to_text(self, landmarks: List[Dict], context: Optional[List[Dict]] = None) -> Dict[str, Any]:
         """Translate landmarks to text - simplified version"""
@@ -66,8 +66,9 @@ class SpeechRecognitionService:
         """Calculate the current audio level for visualization"""
         try:
             audio_array = np.frombuffer(audio_data, dtype=np.int16)
-            # Calculate RMS (Root Mean Square) for volume level
-            rms = np.sqrt(np.mean(audio_array**2))
+            # Calculate RMS (Root Mean Square) for volume level; square in
+            # float so loud int16 samples don't overflow
+            rms = np.sqrt(np.mean(np.square(audio_array, dtype=np.float32)))
             # Normalize to 0-1 range
             normalized_level = min(1.0, rms / 32768.0)
             return normalized_level
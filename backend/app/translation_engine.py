@@ -297,6 +297,11 @@ class TranslationEngine:
         if len(self.translation_history) > 100:
             self.translation_history.pop(0)
     
+    def record_translation(self, input_type: str, translation_result: Dict[str, Any]):
+        """Add a model translation's gloss to context and the result to history"""
+        self._update_context(input_type, translation_result['gloss'])
+        self._add_to_history(translation_result)
+    
     def get_last_translation(self) -> Optional[Dict[str, Any]]:
         """Get the last translation for replay functionality"""
         if self.translation_history:
@@ -398,8 +403,13 @@ class TranslationEngine:
             return await self.i3d_service.process_frame(frame)
         return False
     
-    async def get_i3d_translation(self) -> Optional[Dict[str, Any]]:
-        """Get latest I3D translation if available"""
+    async def get_i3d_translation(self, record: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Get latest I3D translation if available
+        
+        With record=False the caller applies record_translation itself, so
+        concurrent lookups don't interleave context/history updates
+        """
         if not self.i3d_enabled:
             return None
         
@@ -407,15 +417,12 @@ class TranslationEngine:
         i3d_result = await self.i3d_service.get_latest_translation()
         
         if i3d_result and i3d_result.get('success'):
-            # Add to context
-            self._update_context("i3d", i3d_result['gloss'])
-            
             # Generate speech
             audio_result = await self.tts_service.synthesize_speech(i3d_result['text'])
             i3d_result['audio'] = audio_result
             
-            # Add to history
-            self._add_to_history(i3d_result)
+            if record:
+                self.record_translation("i3d", i3d_result)
             
             return i3d_result
         
@@ -444,23 +451,20 @@ class TranslationEngine:
             return await self.ensemble_translator.process_frame(frame)
         return False
     
-    async def get_ensemble_translation(self) -> Optional[Dict[str, Any]]:
-        """Get ensemble translation result"""
+    async def get_ensemble_translation(self, record: bool = True) -> Optional[Dict[str, Any]]:
+        """Get ensemble translation result (record as in get_i3d_translation)"""
         if not self.ensemble_enabled:
             return None
         
         result = await self.ensemble_translator.get_ensemble_prediction()
         
         if result and result.get('success'):
-            # Add to context
-            self._update_context("ensemble", result['gloss'])
-            
             # Generate speech
             audio_result = await self.tts_service.synthesize_speech(result['text'])
             result['audio'] = audio_result
             
-            # Add to history
-            self._add_to_history(result)
+            if record:
+                self.record_translation("ensemble", result)
             
             return result
         
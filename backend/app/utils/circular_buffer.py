@@ -0,0 +1,86 @@
+"""
+Circular tensor buffer
+Fixed-size ring of equally shaped frames (e.g. pose keypoints) stored in one
+preallocated float32 array, so the latest sequence is a contiguous view
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+class CircularTensorBuffer:
+    """Ring buffer whose latest window is always a contiguous slice"""
+
+    def __init__(self,
+                 capacity: int = 64,
+                 sequence_length: int = 30,
+                 fps_target: Optional[float] = None,
+                 dtype=np.float32):
+        """
+        Initialize buffer
+
+        Args:
+            capacity: Frames kept
+            sequence_length: Frames returned by get_latest_sequence
+            fps_target: Drop frames arriving faster than this rate (None keeps all)
+            dtype: Storage dtype
+        """
+        if sequence_length > capacity:
+            raise ValueError("sequence_length must not exceed capacity")
+        self.capacity = capacity
+        self.sequence_length = sequence_length
+        self.dtype = dtype
+        self._min_interval_ns = int(1e9 / fps_target) if fps_target else 0
+        # Every frame is written twice, at i and i + capacity, so any window
+        # ending at the newest frame is one slice; allocated on first frame
+        # once the frame shape is known
+        self._data: Optional[np.ndarray] = None
+        self._next = 0
+        self._size = 0
+        self._total = 0
+        self._last_add_ns = None
+
+    def add_frame(self, frame: Any) -> bool:
+        """Copy a frame in; returns False if dropped by the rate limit"""
+        now = time.perf_counter_ns()
+        if self._last_add_ns is not None and now - self._last_add_ns < self._min_interval_ns:
+            return False
+        self._last_add_ns = now
+
+        frame = np.asarray(frame, dtype=self.dtype)
+        if self._data is None:
+            self._data = np.empty((2 * self.capacity,) + frame.shape, dtype=self.dtype)
+        self._data[self._next] = frame
+        self._data[self._next + self.capacity] = frame
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self._total += 1
+        return True
+
+    def get_latest_sequence(self) -> Optional[np.ndarray]:
+        """
+        Latest sequence_length frames, oldest first, or None if not enough yet.
+        The result is a view; it stays intact for the next
+        capacity - sequence_length additions.
+        """
+        if self._size < self.sequence_length:
+            return None
+        end = self._next + self.capacity
+        return self._data[end - self.sequence_length:end]
+
+    def get_buffer_info(self) -> Dict[str, Any]:
+        """Get buffer state"""
+        return {
+            'current_size': self._size,
+            'total_frames': self._total,
+            'capacity': self.capacity,
+            'sequence_length': self.sequence_length
+        }
+
+    def clear(self):
+        """Forget all frames (storage is kept)"""
+        self._next = 0
+        self._size = 0
+        self._last_add_ns = None
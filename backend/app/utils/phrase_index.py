@@ -0,0 +1,49 @@
+"""
+Phrase index
+Finds which of a fixed set of phrases occurs in a text with one scan,
+keeping the "first listed phrase wins" rule of a plain loop
+"""
+
+from typing import Iterable, Optional
+
+# Try to import pyahocorasick for single-pass phrase matching
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+class PhraseIndex:
+    """Prebuilt substring matcher over a priority-ordered phrase list"""
+
+    def __init__(self, phrases: Iterable[str]):
+        """
+        Build index
+
+        Args:
+            phrases: Lowercase phrases, highest priority first
+        """
+        self.phrases = tuple(phrases)
+        self._priority = {phrase: i for i, phrase in enumerate(self.phrases)}
+
+        if AHOCORASICK_AVAILABLE and self.phrases:
+            self._automaton = ahocorasick.Automaton()
+            for phrase in self.phrases:
+                self._automaton.add_word(phrase, phrase)
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+
+    def first_match(self, text_lower: str) -> Optional[str]:
+        """Return the highest-priority phrase contained in the text"""
+        if self._automaton is not None:
+            best = None
+            for _, phrase in self._automaton.iter(text_lower):
+                if best is None or self._priority[phrase] < self._priority[best]:
+                    best = phrase
+            return best
+        for phrase in self.phrases:
+            if phrase in text_lower:
+                return phrase
+        return None
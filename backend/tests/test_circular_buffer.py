@@ -0,0 +1,38 @@
+"""
+Tests for the circular tensor buffer
+"""
+
+import numpy as np
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.utils.circular_buffer import CircularTensorBuffer
+
+
+def test_latest_sequence_is_ordered_contiguous_view():
+    """After wrapping, the window holds the newest frames oldest-first without copying"""
+    buffer = CircularTensorBuffer(capacity=8, sequence_length=5)
+    for i in range(3):
+        buffer.add_frame(np.full((2, 3), i))
+    assert buffer.get_latest_sequence() is None
+
+    for i in range(3, 19):
+        buffer.add_frame(np.full((2, 3), i))
+
+    sequence = buffer.get_latest_sequence()
+    assert sequence.shape == (5, 2, 3)
+    assert sequence.flags['C_CONTIGUOUS']
+    assert sequence.base is not None
+    assert sequence[:, 0, 0].tolist() == [14, 15, 16, 17, 18]
+    assert buffer.get_buffer_info()['total_frames'] == 19
+
+
+def test_fps_target_drops_fast_frames():
+    """Frames arriving faster than the target rate are rejected"""
+    buffer = CircularTensorBuffer(capacity=4, sequence_length=2, fps_target=1)
+    assert buffer.add_frame(np.zeros(3))
+    assert not buffer.add_frame(np.zeros(3))
+    assert buffer.get_buffer_info()['current_size'] == 1
@@ -0,0 +1,74 @@
+"""
+Tests for the LLM response cache
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.llm_cache import LLMCache, cached_llm, llm_cache, semantic_cache
+
+
+def test_key_ignores_case_and_context_timestamps():
+    """Keys normalize text and only use context type/content"""
+    ctx_a = [{"type": "speech", "content": "hi", "timestamp": "2024-01-01T00:00:00"}]
+    ctx_b = [{"type": "speech", "content": "hi", "timestamp": "2024-01-02T00:00:00"}]
+
+    key_a = LLMCache.make_key("OpenAIProvider", "gpt", "speech_to_sign", " Hello ", ctx_a)
+    key_b = LLMCache.make_key("OpenAIProvider", "gpt", "speech_to_sign", "hello", ctx_b)
+    assert key_a == key_b
+
+    other_mode = LLMCache.make_key("OpenAIProvider", "gpt", "sign_to_speech", "hello", ctx_a)
+    assert other_mode != key_a
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_counters():
+    """Least recently used entry is evicted and hits/misses are counted"""
+    cache = LLMCache(max_size=2)
+
+    await cache.set("a", {"gloss": "A"})
+    await cache.set("b", {"gloss": "B"})
+    assert await cache.get("a") == {"gloss": "A"}  # "b" is now oldest
+
+    await cache.set("c", {"gloss": "C"})
+    assert await cache.get("b") is None
+    assert await cache.get("c") == {"gloss": "C"}
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_dropped():
+    """Entries past their TTL are treated as misses"""
+    cache = LLMCache(ttl_seconds=0)
+
+    await cache.set("a", {"gloss": "A"})
+    assert await cache.get("a") is None
+    assert cache.get_stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_failure_falls_through(monkeypatch):
+    """A broken embedding model disables the semantic cache instead of failing translation"""
+    async def broken_embed(text):
+        raise OSError("model unavailable")
+
+    monkeypatch.setattr(semantic_cache, "enabled", True)
+    monkeypatch.setattr(semantic_cache, "_embed", broken_embed)
+    llm_cache.clear()
+
+    class Provider:
+        @cached_llm("speech_to_sign")
+        async def translate(self, text, context=None):
+            return {"success": True, "gloss": text.upper()}
+
+    result = await Provider().translate("hello")
+    assert result["gloss"] == "HELLO"
+    assert not semantic_cache.enabled
@@ -0,0 +1,63 @@
+"""
+Tests for the provider request batcher
+"""
+
+import asyncio
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.request_batcher import RequestBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_prompts_share_upstream_calls():
+    """Prompts within one window go out together, replies stay in order"""
+    batch_sizes = []
+
+    async def send_batch(prompts):
+        batch_sizes.append(len(prompts))
+        return [prompt.upper() for prompt in prompts]
+
+    batcher = RequestBatcher(send_batch, max_batch_size=4)
+    replies = await asyncio.gather(*[batcher.submit(f"p{i}") for i in range(6)])
+    await batcher.close()
+
+    assert replies == ["P0", "P1", "P2", "P3", "P4", "P5"]
+    assert batch_sizes == [4, 2]
+
+
+@pytest.mark.asyncio
+async def test_upstream_error_reaches_every_caller():
+    """A failed batch raises in each waiting caller"""
+    async def send_batch(prompts):
+        raise RuntimeError("upstream down")
+
+    batcher = RequestBatcher(send_batch)
+    results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+    await batcher.close()
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_in_flight_requests():
+    """Callers waiting on a dispatched batch are released by close()"""
+    started = asyncio.Event()
+
+    async def send_batch(prompts):
+        started.set()
+        await asyncio.sleep(10)
+        return prompts
+
+    batcher = RequestBatcher(send_batch)
+    pending = asyncio.ensure_future(batcher.submit("a"))
+    await started.wait()
+    await batcher.close()
+
+    with pytest.raises(asyncio.CancelledError):
+        await pending
+    assert not batcher._dispatches
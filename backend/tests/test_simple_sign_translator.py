@@ -0,0 +1,32 @@
+"""
+Tests for the rule-based sign translator
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.simple_sign_translator import SimpleSignTranslator
+
+
+@pytest.mark.asyncio
+async def test_articles_and_to_be_are_dropped():
+    """Articles and "to be" verbs are removed instead of fingerspelled"""
+    result = await SimpleSignTranslator().translate_text_to_signs("the cat is happy")
+
+    assert result["success"]
+    assert "[THE]" not in result["signs"]
+    assert "[IS]" not in result["signs"]
+    assert result["signs"][0] == "[CAT]"
+
+
+@pytest.mark.asyncio
+async def test_question_words_move_to_the_end():
+    """Question words are signed after the rest of the sentence"""
+    result = await SimpleSignTranslator().translate_text_to_signs("where is the library")
+
+    assert result["signs"][-1] == "WHERE"
+    assert "[IS]" not in result["signs"]
@@ -1,4 +1,4 @@
-import { useState, useEffect, useRef } from 'react'
+import { useState, useEffect, useRef, useCallback } from 'react'
 import './App.css'
 import Header from './components/Header'
 import AvatarDisplay from './components/AvatarDisplay'
@@ -10,6 +10,7 @@ import ReplayModal from './components/ReplayModal'
 import PerformanceMonitor from './components/PerformanceMonitor'
 import { useWebSocket } from './hooks/useWebSocket'
 import { useMediaStream } from './hooks/useMediaStream'
+import { packStreamFrame } from './utils/streamFrame'
 import LandingPage from './pages/LandingPage'
 
 function App() {
@@ -25,13 +26,35 @@ function App() {
   const [currentSessionId, setCurrentSessionId] = useState<string | null>(null)
   const [currentLatency, setCurrentLatency] = useState<number>(0)
   
+  // Handle incoming translation results (each element of a batched frame)
+  const handleMessage = useCallback((data: any) => {
+    if (data.type === 'translation_result' && data.translation) {
+      if (data.translation.type === 'speech_to_sign') {
+        setCurrentWord(data.translation.input_text)
+        if (data.translation.signs && data.translation.signs.length > 0) {
+          setCurrentAnimation(data.translation.signs[0])
+        }
+      } else if (data.translation.type === 'sign_to_speech') {
+        setCurrentWord(data.translation.output_text)
+        // Play audio if available
+        if (data.translation.audio) {
+          // Handle audio playback
+        }
+      }
+      setCurrentMode(data.mode)
+    }
+    // Update latency if available
+    if (data.performance && data.performance.latency_ms) {
+      setCurrentLatency(data.performance.latency_ms)
+    }
+  }, [])
+
   const { 
     isConnected, 
-    sendMessage, 
-    lastMessage,
+    sendBinary,
     audioLevel,
     motionLevel 
-  } = useWebSocket('ws://localhost:8000/ws')
+  } = useWebSocket('ws://localhost:8000/ws', handleMessage)
   
   const { 
     isMicActive, 
@@ -43,32 +66,6 @@ function App() {
     audioProcessor
   } = useMediaStream()
 
-  // Handle incoming translation results
-  useEffect(() => {
-    if (lastMessage) {
-      const data = JSON.parse(lastMessage)
-      if (data.type === 'translation_result' && data.translation) {
-        if (data.translation.type === 'speech_to_sign') {
-          setCurrentWord(data.translation.input_text)
-          if (data.translation.signs && data.translation.signs.length > 0) {
-            setCurrentAnimation(data.translation.signs[0])
-          }
-        } else if (data.translation.type === 'sign_to_speech') {
-          setCurrentWord(data.translation.output_text)
-          // Play audio if available
-          if (data.translation.audio) {
-            // Handle audio playback
-          }
-        }
-        setCurrentMode(data.mode)
-      }
-      // Update latency if available
-      if (data.performance && data.performance.latency_ms) {
-        setCurrentLatency(data.performance.latency_ms)
-      }
-    }
-  }, [lastMessage])
-
   // Start media streams and session on mount
   useEffect(() => {
     startMedia()
@@ -127,29 +124,25 @@ function App() {
         
         if (ctx) {
           ctx.drawImage(video, 0, 0)
-          const imageData = canvas.toDataURL('image/jpeg', 0.8)
           
-          // Get current audio buffer as base64
-          let audioData = ''
+          // Get current audio buffer as raw float32 samples
+          let audioData: Float32Array | null = null
           if (audioBuffer.length > 0) {
             const totalLength = audioBuffer.reduce((sum, chunk) => sum + chunk.length, 0)
-            const combinedBuffer = new Float32Array(totalLength)
+            audioData = new Float32Array(totalLength)
             let offset = 0
             for (const chunk of audioBuffer) {
-              combinedBuffer.set(chunk, offset)
+              audioData.set(chunk, offset)
               offset += chunk.length
             }
-            audioData = btoa(String.fromCharCode(...new Uint8Array(combinedBuffer.buffer)))
             audioBuffer = [] // Clear after sending
           }
           
-          // Send combined audio/video message
-          sendMessage({
-            type: 'stream',
-            video: imageData,
-            audio: audioData || 'mock_audio_data',
-            timestamp: Date.now()
-          })
+          // Send combined audio/video as one binary frame (no base64)
+          canvas.toBlob(async (blob) => {
+            if (!blob) return
+            sendBinary(packStreamFrame(audioData, await blob.arrayBuffer()))
+          }, 'image/jpeg', 0.8)
         }
       }
     }, 100) // Send frames at 10 FPS
@@ -160,7 +153,7 @@ function App() {
         audioProcessor.onaudioprocess = null
       }
     }
-  }, [isConnected, audioStream, videoStream, audioProcessor, sendMessage])
+  }, [isConnected, audioStream, videoStream, audioProcessor, sendBinary])
 
   const startSession = async () => {
     try {
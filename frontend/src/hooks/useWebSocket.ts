@@ -3,18 +3,21 @@ import { useState, useEffect, useRef, useCallback } from 'react'
 interface WebSocketState {
   isConnected: boolean
   sendMessage: (message: any) => void
+  sendBinary: (data: ArrayBuffer) => void
   lastMessage: string | null
   audioLevel: number
   motionLevel: number
 }
 
-export const useWebSocket = (url: string): WebSocketState => {
+export const useWebSocket = (url: string, onMessage?: (data: any) => void): WebSocketState => {
   const [isConnected, setIsConnected] = useState(false)
   const [lastMessage, setLastMessage] = useState<string | null>(null)
   const [audioLevel, setAudioLevel] = useState(0)
   const [motionLevel, setMotionLevel] = useState(0)
   const wsRef = useRef<WebSocket | null>(null)
   const reconnectTimeoutRef = useRef<NodeJS.Timeout>()
+  const onMessageRef = useRef(onMessage)
+  onMessageRef.current = onMessage
 
   const connect = useCallback(() => {
     try {
@@ -26,15 +29,21 @@ export const useWebSocket = (url: string): WebSocketState => {
       }
       
       ws.onmessage = (event) => {
-        setLastMessage(event.data)
         try {
           const data = JSON.parse(event.data)
-          if (data.audio_level !== undefined) {
-            setAudioLevel(data.audio_level)
-          }
-          if (data.motion_level !== undefined) {
-            setMotionLevel(data.motion_level)
+          // The server coalesces backlogged results into {batch: [...]};
+          // every element is handed to onMessage in order
+          const messages = Array.isArray(data.batch) ? data.batch : [data]
+          for (const message of messages) {
+            onMessageRef.current?.(message)
+            if (message.audio_level !== undefined) {
+              setAudioLevel(message.audio_level)
+            }
+            if (message.motion_level !== undefined) {
+              setMotionLevel(message.motion_level)
+            }
           }
+          setLastMessage(messages.length === 1 ? event.data : JSON.stringify(messages[messages.length - 1]))
         } catch (error) {
           console.error('Error parsing WebSocket message:', error)
         }
@@ -81,9 +90,18 @@ export const useWebSocket = (url: string): WebSocketState => {
     }
   }, [])
 
+  const sendBinary = useCallback((data: ArrayBuffer) => {
+    if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+      wsRef.current.send(data)
+    } else {
+      console.warn('WebSocket is not connected')
+    }
+  }, [])
+
   return {
     isConnected,
     sendMessage,
+    sendBinary,
     lastMessage,
     audioLevel,
     motionLevel
@@ -0,0 +1,22 @@
+// Binary stream frame understood by the backend /ws endpoint:
+// little-endian header <kind: u8><audio length: u32><video length: u32>,
+// followed by the raw audio (float32 PCM) and video (JPEG) bytes
+
+export const STREAM_FRAME_KIND = 1
+const HEADER_SIZE = 9
+
+export const packStreamFrame = (audio: Float32Array | null, video: ArrayBuffer): ArrayBuffer => {
+  const audioLength = audio ? audio.byteLength : 0
+  const frame = new ArrayBuffer(HEADER_SIZE + audioLength + video.byteLength)
+  const header = new DataView(frame)
+  header.setUint8(0, STREAM_FRAME_KIND)
+  header.setUint32(1, audioLength, true)
+  header.setUint32(5, video.byteLength, true)
+
+  const bytes = new Uint8Array(frame)
+  if (audio) {
+    bytes.set(new Uint8Array(audio.buffer, audio.byteOffset, audioLength), HEADER_SIZE)
+  }
+  bytes.set(new Uint8Array(video), HEADER_SIZE + audioLength)
+  return frame
+}
@@ -16,7 +16,7 @@ trap cleanup EXIT INT TERM
 echo "📦 Starting Backend Server..."
 cd backend
 source venv/bin/activate 2>/dev/null || . venv/bin/activate
-uvicorn app.main:app --reload --host 0.0.0.0 --port 8000 &
+uvicorn app.main:app --reload --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --ws-per-message-deflate false &
 BACKEND_PID=$!
 cd ..
 
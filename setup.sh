@@ -148,7 +148,7 @@ trap cleanup EXIT INT TERM
 echo "Starting backend server..."
 cd backend
 source venv/bin/activate
-uvicorn app.main:app --reload --host 0.0.0.0 --port 8000 &
+uvicorn app.main:app --reload --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --ws-per-message-deflate false &
 BACKEND_PID=$!
 cd ..
 
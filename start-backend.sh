@@ -1,4 +1,4 @@
 #!/bin/bash
 cd backend
 source venv/bin/activate 2>/dev/null || . venv/bin/activate
-python -m uvicorn app.main:app --reload --host 0.0.0.0 --port 8000
\ No newline at end of file
+python -m uvicorn app.main:app --reload --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --ws-per-message-deflate false
\ No newline at end of file